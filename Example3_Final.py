@@ -1,7 +1,13 @@
+import heapq
 import matplotlib.pyplot as plt
 import networkx as nx
+import numbers
 import os
 
+def task_time(value, task):
+    # T_send / T_cloud / T_receive 既可以是全局常量，也可以是按任务索引的时间表（dict 或数组）
+    return value if isinstance(value, numbers.Number) else value[task]
+
 def create_task_graph():
     G = nx.DiGraph()
     G.add_edges_from([
@@ -24,7 +30,7 @@ def create_task_graph():
     }
     return G, execution_times
 
-def compute_priorities(G, execution_times):
+def compute_priority_values(G, execution_times):
     priorities = {}
     successors = {node: list(G.successors(node)) for node in G.nodes()}
 
@@ -38,17 +44,28 @@ def compute_priorities(G, execution_times):
     for task in G.nodes():
         calculate_priority(task)
 
+    return priorities
+
+def compute_priorities(G, execution_times):
+    priorities = compute_priority_values(G, execution_times)
     return sorted(priorities.keys(), key=lambda x: priorities[x], reverse=True)
 
-def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
+def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive, priorities=None):
     scheduled_tasks = {}
     cores = [0, 0, 0]  # 每个核心的最早空闲时间
     core_task_queues = {i: [] for i in range(3)}  # 每个核心的任务队列
     wireless_sending = 0  # 无线发送最早空闲时间
 
-    task_order = compute_priorities(G, execution_times)
+    # 就绪队列：只有前驱全部调度完的任务才入堆，按优先级出堆，因此任意优先级函数都能得到合法调度
+    if priorities is None:
+        priorities = compute_priority_values(G, execution_times)
+    rank = {task: i for i, task in enumerate(priorities)}  # 优先级相同时按插入顺序
+    remaining_preds = {task: G.in_degree(task) for task in G.nodes()}
+    ready_heap = [(-priorities[task], rank[task], task) for task in G.nodes() if remaining_preds[task] == 0]
+    heapq.heapify(ready_heap)
 
-    for task in task_order:
+    while ready_heap:
+        _, _, task = heapq.heappop(ready_heap)
         preds = list(G.predecessors(task))
         
         # 计算 ready_time
@@ -76,10 +93,10 @@ def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
 
         # 云端执行时间
         start_sending = max(wireless_sending, ready_time)
-        start_cloud = start_sending + T_send #最左边右顶点
-        finish_cloud = start_cloud + T_cloud #中间右顶点
+        start_cloud = start_sending + task_time(T_send, task) #最左边右顶点
+        finish_cloud = start_cloud + task_time(T_cloud, task) #中间右顶点
         start_receiving = finish_cloud       #中间右顶点
-        cloud_finish_time = start_receiving + T_receive #右边右顶点
+        cloud_finish_time = start_receiving + task_time(T_receive, task) #右边右顶点
 
         # 选择更优的执行位置
         if cloud_finish_time < local_finish_time:
@@ -91,7 +108,7 @@ def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
                 'start_time_cloud': start_cloud,
                 'finish_time_cloud': finish_cloud
             }
-            wireless_sending = start_sending + T_send
+            wireless_sending = start_sending + task_time(T_send, task)
         else:
             scheduled_tasks[task] = {
                 'ready_time': ready_time,
@@ -103,6 +120,11 @@ def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
             cores[best_core] = local_finish_time
             core_task_queues[best_core].append(scheduled_tasks[task])  # 更新核心队列
 
+        for succ in G.successors(task):
+            remaining_preds[succ] -= 1
+            if remaining_preds[succ] == 0:
+                heapq.heappush(ready_heap, (-priorities[succ], rank[succ], succ))
+
     return scheduled_tasks
 
 def kernel_algorithm(G, scheduled_tasks, execution_times, task, target, T_send, T_cloud, T_receive):
@@ -131,10 +153,10 @@ def kernel_algorithm(G, scheduled_tasks, execution_times, task, target, T_send,
         cores[best_core] = local_finish_time
     elif target == 'cloud':
         start_sending = max(ready_time, 0)
-        start_cloud = start_sending + T_send
-        finish_cloud = start_cloud + T_cloud
+        start_cloud = start_sending + task_time(T_send, task)
+        finish_cloud = start_cloud + task_time(T_cloud, task)
         start_receiving = finish_cloud
-        cloud_finish_time = start_receiving + T_receive
+        cloud_finish_time = start_receiving + task_time(T_receive, task)
         new_scheduled_tasks[task] = {
             'start_time': start_sending,
             'finish_time': cloud_finish_time,
@@ -145,38 +167,10 @@ def kernel_algorithm(G, scheduled_tasks, execution_times, task, target, T_send,
 
     return new_scheduled_tasks
 
-def compute_critical_path(G, scheduled_tasks, execution_times):
-    critical_path = []
-    max_time = 0
-    for node in nx.topological_sort(G):
-        preds = list(G.predecessors(node))
-
-        if preds:
-            start_time = max(scheduled_tasks[pred]['finish_time'] for pred in preds)
-        else:
-            start_time = 0
-
-        if scheduled_tasks[node]['location'] == 'core':
-            core = scheduled_tasks[node]['core'] - 1
-            execution_time = execution_times[node][core]
-        elif scheduled_tasks[node]['location'] == 'cloud':
-            execution_time = 3 + 1 + 1
-
-        finish_time = start_time + execution_time
-        scheduled_tasks[node]['start_time'] = start_time
-        scheduled_tasks[node]['finish_time'] = finish_time
-
-        if finish_time > max_time:
-            max_time = finish_time
-            critical_path = [node]
-        elif finish_time == max_time:
-            critical_path.append(node)
-
-    return critical_path, max_time
-
-def compute_energy(scheduled_tasks, execution_times, T_send, T_receive):
-    core_powers = {1: 1, 2: 2, 3: 4}
-    rf_power = 0.5
+def compute_energy(scheduled_tasks, execution_times, T_send, T_receive, core_powers=None, rf_power=None):
+    # 默认功率：Core1/2/3 为 1/2/4，无线收发为 0.5；灵敏度分析时可传入其他取值
+    core_powers = {1: 1, 2: 2, 3: 4} if core_powers is None else core_powers
+    rf_power = 0.5 if rf_power is None else rf_power
 
     core_energy = {1: 0, 2: 0, 3: 0}
     cloud_energy = 0
@@ -187,8 +181,8 @@ def compute_energy(scheduled_tasks, execution_times, T_send, T_receive):
             execution_time = execution_times[task][core - 1]
             core_energy[core] += core_powers[core] * execution_time
         elif details['location'] == 'cloud':
-            cloud_energy += rf_power * T_send
-            cloud_energy += rf_power * T_receive
+            cloud_energy += rf_power * task_time(T_send, task)
+            cloud_energy += rf_power * task_time(T_receive, task)
 
     total_energy = sum(core_energy.values()) + cloud_energy
     return core_energy, cloud_energy, total_energy
@@ -231,14 +225,14 @@ def recalculate_schedule_times(G, scheduled_tasks, execution_times, T_send, T_cl
 
         elif scheduled_tasks[node]['location'] == 'cloud':
             start_sending = max(wireless_sending, ready_time)
-            start_cloud = start_sending + T_send
-            finish_cloud = start_cloud + T_cloud
+            start_cloud = start_sending + task_time(T_send, node)
+            finish_cloud = start_cloud + task_time(T_cloud, node)
             start_receiving = finish_cloud
-            finish_time = start_receiving + T_receive
+            finish_time = start_receiving + task_time(T_receive, node)
 
             start_time = start_sending  # 云端任务的起始时间是开始发送的时间
-            execution_time = T_send + T_cloud + T_receive
-            wireless_sending = start_sending + T_send  # 更新无线发送的空闲时间
+            execution_time = task_time(T_send, node) + task_time(T_cloud, node) + task_time(T_receive, node)
+            wireless_sending = start_sending + task_time(T_send, node)  # 更新无线发送的空闲时间
 
         # 更新任务的时间信息
         scheduled_tasks[node]['ready_time'] = ready_time
@@ -290,16 +284,16 @@ def compute_critical_path(G, scheduled_tasks, execution_times, T_send, T_cloud,
             })
         elif scheduled_tasks[node]['location'] == 'cloud':
             start_sending = max(wireless_sending, ready_time)
-            start_cloud = start_sending + T_send
-            finish_cloud = start_cloud + T_cloud
+            start_cloud = start_sending + task_time(T_send, node)
+            finish_cloud = start_cloud + task_time(T_cloud, node)
             start_receiving = finish_cloud
-            finish_time = start_receiving + T_receive
+            finish_time = start_receiving + task_time(T_receive, node)
             start_time = start_sending  # Start time for cloud tasks corresponds to the sending start time
-            execution_time = T_send + T_cloud + T_receive
+            execution_time = task_time(T_send, node) + task_time(T_cloud, node) + task_time(T_receive, node)
             location = "Cloud"
 
             # Update cloud availability
-            wireless_sending = start_sending + T_send
+            wireless_sending = start_sending + task_time(T_send, node)
 
         # Update scheduled task's timing
         scheduled_tasks[node]['ready_time'] = ready_time
@@ -399,22 +393,23 @@ def visualize_scheduling(scheduled_tasks, execution_times, T_send, T_cloud, T_re
                      str(task), va='center', ha='center', color='white', fontsize=8)
         elif details['location'] == 'cloud':
             start_time = details.get('start_time')  # 云端任务的 ST
-            cloud_start_time = start_time + 3  # 云端处理的 ST
-            receive_start_time = cloud_start_time + 1
+            send_time, cloud_time, receive_time = task_time(T_send, task), task_time(T_cloud, task), task_time(T_receive, task)
+            cloud_start_time = start_time + send_time  # 云端处理的 ST
+            receive_start_time = cloud_start_time + cloud_time
 
             # 绘制无线发送
-            plt.barh('Wireless Sending', T_send, left=start_time, color=color, edgecolor='black', label=f'Task {task}')
-            plt.text(start_time + T_send / 2, 'Wireless Sending',
+            plt.barh('Wireless Sending', send_time, left=start_time, color=color, edgecolor='black', label=f'Task {task}')
+            plt.text(start_time + send_time / 2, 'Wireless Sending',
                      str(task), va='center', ha='center', color='white', fontsize=8)
 
             # 绘制云端处理
-            plt.barh('Cloud', T_cloud, left=cloud_start_time, color=color, edgecolor='black')
-            plt.text(cloud_start_time + T_cloud / 2, 'Cloud',
+            plt.barh('Cloud', cloud_time, left=cloud_start_time, color=color, edgecolor='black')
+            plt.text(cloud_start_time + cloud_time / 2, 'Cloud',
                      str(task), va='center', ha='center', color='white', fontsize=8)
 
             # 绘制无线接收
-            plt.barh('Wireless Receiving', T_receive, left=receive_start_time, color=color, edgecolor='black')
-            plt.text(receive_start_time + T_receive / 2, 'Wireless Receiving',
+            plt.barh('Wireless Receiving', receive_time, left=receive_start_time, color=color, edgecolor='black')
+            plt.text(receive_start_time + receive_time / 2, 'Wireless Receiving',
                      str(task), va='center', ha='center', color='white', fontsize=8)
 
     plt.xlabel("Time")
@@ -0,0 +1,167 @@
+import numbers
+from bisect import bisect_left, bisect_right
+
+from Example5_Final import compute_energy, compute_priorities, create_task_graph, task_time
+from migration import sequence_order
+
+
+def new_timeline(min_gap=0):
+    # 资源时间轴：按开始时间排序的空闲区间 [starts[i], ends[i])
+    # 短于 min_gap 的空闲区间不可能再被使用，直接丢弃，查询时就不必跳过它们
+    return {'starts': [0], 'ends': [float('inf')], 'min_gap': min_gap}
+
+
+def timeline_earliest_slot(timeline, ready_time, duration):
+    starts, ends = timeline['starts'], timeline['ends']
+    i = bisect_left(ends, ready_time + duration)
+    # 只有遇到短于 duration 的空闲区间才会继续向后找；同一通道上传输时长相同时一步命中
+    while True:
+        start = max(starts[i], ready_time)
+        if start + duration <= ends[i]:
+            return start
+        i += 1
+
+
+def timeline_reserve(timeline, start, duration):
+    starts, ends, min_gap = timeline['starts'], timeline['ends'], timeline['min_gap']
+    i = bisect_right(starts, start) - 1
+    gap_start, gap_end = starts[i], ends[i]
+    pieces = [(s, e) for s, e in ((gap_start, start), (start + duration, gap_end)) if e - s > 0 and e - s >= min_gap]
+    starts[i:i + 1] = [s for s, _ in pieces]
+    ends[i:i + 1] = [e for _, e in pieces]
+
+
+def channels_earliest_slot(timelines, ready_time, duration):
+    # 多个通道时取最早可用的那个，同时可用时取编号小的
+    best_start, best_channel = None, None
+    for channel, timeline in enumerate(timelines):
+        start = timeline_earliest_slot(timeline, ready_time, duration)
+        if best_start is None or start < best_start:
+            best_start, best_channel = start, channel
+    return best_start, best_channel
+
+
+def min_task_time(value):
+    # 按任务给出的时间表取最短的那个作为时间轴的 min_gap
+    if isinstance(value, numbers.Number):
+        return value
+    return min(value.values()) if isinstance(value, dict) else min(value)
+
+
+def new_channels(num_send_channels, num_receive_channels, T_send, T_receive):
+    sending = [new_timeline(min_task_time(T_send)) for _ in range(num_send_channels)]
+    receiving = [new_timeline(min_task_time(T_receive)) for _ in range(num_receive_channels)]
+    return sending, receiving
+
+
+def schedule_cloud_task(task, details, ready_time, sending, receiving, T_send, T_cloud, T_receive,
+                        reserve=True, computing=None):
+    # computing: 云端容量有限时，每个云端执行单元一条时间轴；None 表示云端容量不受限
+    T_send, T_cloud, T_receive = task_time(T_send, task), task_time(T_cloud, task), task_time(T_receive, task)
+    start_sending, send_channel = channels_earliest_slot(sending, ready_time, T_send)
+    start_cloud = start_sending + T_send
+    if computing is not None:
+        start_cloud, cloud_unit = channels_earliest_slot(computing, start_cloud, T_cloud)
+    finish_cloud = start_cloud + T_cloud
+    start_receiving, receive_channel = channels_earliest_slot(receiving, finish_cloud, T_receive)
+
+    if reserve:
+        timeline_reserve(sending[send_channel], start_sending, T_send)
+        timeline_reserve(receiving[receive_channel], start_receiving, T_receive)
+        if computing is not None:
+            timeline_reserve(computing[cloud_unit], start_cloud, T_cloud)
+            details['cloud_unit'] = cloud_unit + 1
+
+    details.update({
+        'start_time': start_sending,
+        'finish_time': start_receiving + T_receive,
+        'start_time_cloud': start_cloud,
+        'finish_time_cloud': finish_cloud,
+        'start_time_receive': start_receiving,
+        'send_channel': send_channel + 1,
+        'receive_channel': receive_channel + 1,
+    })
+    return details
+
+
+def initial_scheduling_channels(G, execution_times, T_send, T_cloud, T_receive,
+                                num_send_channels=1, num_receive_channels=1):
+    """
+    initial_scheduling with several wireless sending and receiving channels, each a
+    timeline of free gaps, so receive contention is modeled and transfers can use
+    any idle channel.
+    """
+    scheduled_tasks = {}
+    cores = [0, 0, 0]
+    sending, receiving = new_channels(num_send_channels, num_receive_channels, T_send, T_receive)
+
+    for task in compute_priorities(G, execution_times):
+        ready_time = 0
+        for pred in G.predecessors(task):
+            if scheduled_tasks[pred]['location'] == 'core':
+                ready_time = max(ready_time, scheduled_tasks[pred]['finish_time'])
+            else:
+                ready_time = max(ready_time, scheduled_tasks[pred]['start_time_cloud'])
+
+        core_times = [max(cores[i], ready_time) + execution_times[task][i] for i in range(3)]
+        best_core = core_times.index(min(core_times))
+
+        cloud = schedule_cloud_task(task, {'ready_time': ready_time, 'location': 'cloud'}, ready_time,
+                                    sending, receiving, T_send, T_cloud, T_receive, reserve=False)
+        if cloud['finish_time'] < core_times[best_core]:
+            scheduled_tasks[task] = schedule_cloud_task(task, cloud, ready_time, sending, receiving,
+                                                        T_send, T_cloud, T_receive)
+        else:
+            scheduled_tasks[task] = {
+                'ready_time': ready_time,
+                'start_time': core_times[best_core] - execution_times[task][best_core],
+                'finish_time': core_times[best_core],
+                'location': 'core',
+                'core': best_core + 1
+            }
+            cores[best_core] = core_times[best_core]
+
+    return scheduled_tasks
+
+
+def recalculate_schedule_times_channels(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive,
+                                        num_send_channels=1, num_receive_channels=1):
+    # 按原调度的开始时间顺序重新计时（sequence_order），保持各核心与信道上的任务先后
+    cores = [0, 0, 0]
+    sending, receiving = new_channels(num_send_channels, num_receive_channels, T_send, T_receive)
+
+    for node in sequence_order(G, scheduled_tasks):
+        details = scheduled_tasks[node]
+        ready_time = max(
+            (scheduled_tasks[pred]['finish_time'] if scheduled_tasks[pred]['location'] == 'core'
+             else scheduled_tasks[pred]['start_time_cloud']
+             for pred in G.predecessors(node)),
+            default=0
+        )
+        details['ready_time'] = ready_time
+
+        if details['location'] == 'core':
+            core = details['core'] - 1
+            details['start_time'] = max(ready_time, cores[core])
+            details['finish_time'] = details['start_time'] + execution_times[node][core]
+            cores[core] = details['finish_time']
+        else:
+            schedule_cloud_task(node, details, ready_time, sending, receiving, T_send, T_cloud, T_receive)
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    for num_send_channels, num_receive_channels in ((1, 1), (2, 1), (2, 2), (3, 3)):
+        schedule = initial_scheduling_channels(G, execution_times, T_send, T_cloud, T_receive,
+                                               num_send_channels, num_receive_channels)
+        critical_time = max(details['finish_time'] for details in schedule.values())
+        total_energy = compute_energy(schedule, execution_times, T_send, T_receive)[2]
+        offloaded = sum(details['location'] == 'cloud' for details in schedule.values())
+        print(f"Send channels = {num_send_channels}, Receive channels = {num_receive_channels}: "
+              f"T_total = {critical_time}, Energy = {total_energy}, Cloud tasks = {offloaded}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+
+from graph_cache import graph_fingerprint
+
+
+def assignment_to_state(scheduled_tasks):
+    # 只保存每个任务的位置和核心：重新计时即可恢复全部时间信息
+    return [[task, details['location'], details.get('core')] for task, details in scheduled_tasks.items()]
+
+
+def assignment_from_state(assignment):
+    return {task: ({'location': 'core', 'core': core} if location == 'core' else {'location': 'cloud'})
+            for task, location, core in assignment}
+
+
+def write_checkpoint(path, state):
+    # 先写临时文件再原子替换，写到一半被中断时旧的检查点仍然完整
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def run_key(G, execution_times, T_max, *inputs):
+    """
+    What a checkpoint was computed for: the graph fingerprint (nodes, edges and
+    execution times), T_max, and a digest of the other inputs that change the result
+    (cloud timing values, task list, power constants, optimizer settings, the input
+    schedule).
+    """
+    return {'graph': graph_fingerprint(G, execution_times), 'T_max': T_max,
+            'inputs': hashlib.sha256(repr(inputs).encode()).hexdigest()}
+
+
+def read_checkpoint(path, kind, key):
+    """
+    Loads the checkpoint at `path`, or returns None if there is none. Raises ValueError
+    when the file was written by a different optimizer or for a different run_key.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('kind') != kind:
+        raise ValueError(f"checkpoint {path} does not belong to this {kind} run")
+    for field, value in key.items():
+        if state.get('key', {}).get(field) != value:
+            raise ValueError(f"checkpoint {path} does not match this run ({field} differs)")
+    return state
+
+
+def remove_checkpoint(path):
+    if path is not None and os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,55 @@
+from Example5_Final import compute_energy, create_task_graph, initial_scheduling, task_time
+from migration import migrate_tasks
+
+
+def set_cloud_profile(G, task, T_send=None, T_cloud=None, T_receive=None):
+    # 在任务图节点上记录该任务自己的发送/云端计算/接收时间
+    for key, value in (('T_send', T_send), ('T_cloud', T_cloud), ('T_receive', T_receive)):
+        if value is not None:
+            G.nodes[task][key] = value
+
+
+def cloud_time_tables(G, T_send, T_cloud, T_receive, uplink_rate=None, downlink_rate=None):
+    """
+    Per-task T_send / T_cloud / T_receive tables for a task graph, ready to be passed
+    anywhere the global constants are accepted. A node's own 'T_send', 'T_cloud' and
+    'T_receive' attributes override the defaults; when a link rate is given, the
+    'data_size' of the task's incoming (outgoing) edges adds data_size / rate to its
+    send (receive) time.
+    """
+    tables = ({}, {}, {})
+    for task, attrs in G.nodes(data=True):
+        send = attrs.get('T_send', task_time(T_send, task))
+        cloud = attrs.get('T_cloud', task_time(T_cloud, task))
+        receive = attrs.get('T_receive', task_time(T_receive, task))
+        if uplink_rate:
+            send += sum(data.get('data_size', 0) for _, _, data in G.in_edges(task, data=True)) / uplink_rate
+        if downlink_rate:
+            receive += sum(data.get('data_size', 0) for _, _, data in G.out_edges(task, data=True)) / downlink_rate
+        for table, value in zip(tables, (send, cloud, receive)):
+            table[task] = value
+    return tables
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_max = 39
+
+    # 示例：任务 12 的数据量较大，任务 20 的云端计算更耗时
+    set_cloud_profile(G, 20, T_cloud=4)
+    for u, v in G.edges():
+        G.edges[u, v]['data_size'] = 4 if v == 12 else 1
+    T_send, T_cloud, T_receive = cloud_time_tables(G, 2, 1, 1, uplink_rate=2, downlink_rate=4)
+
+    schedule = migrate_tasks(G, initial_scheduling(G, execution_times, T_send, T_cloud, T_receive),
+                             execution_times, T_send, T_cloud, T_receive, T_max)
+    for task, details in schedule.items():
+        if details['location'] == 'cloud':
+            print(f"Task {task}: Send = {T_send[task]}, Cloud = {T_cloud[task]}, Receive = {T_receive[task]}, "
+                  f"Start = {details['start_time']}, Finish = {details['finish_time']}")
+    print(f"T_total = {max(d['finish_time'] for d in schedule.values())}, "
+          f"Energy = {compute_energy(schedule, execution_times, T_send, T_receive)[2]}")
+
+
+if __name__ == '__main__':
+    main()
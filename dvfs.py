@@ -0,0 +1,155 @@
+import networkx as nx
+import numpy as np
+
+from Example5_Final import compute_energy, create_task_graph, initial_scheduling, task_time
+from migration import (CORE_POWERS, NUM_CORES, RF_POWER, build_slack_index, copy_schedule, exceeds_slack,
+                       migrate_tasks, place_task, retime_schedule, sequence_order)
+
+# 每个核心的 (频率比例, 电压比例) 档位，第 0 档为 execution_times 对应的额定频率
+# 动态功率按 f * V^2 缩放，执行时间按 1 / f 缩放
+FREQUENCY_LEVELS = {
+    1: [(1.0, 1.0), (0.8, 0.9), (0.6, 0.8)],
+    2: [(1.0, 1.0), (0.8, 0.9), (0.6, 0.8)],
+    3: [(1.0, 1.0), (0.8, 0.9), (0.6, 0.8)],
+}
+
+
+def build_dvfs_tables(execution_times, tasks, frequency_levels=FREQUENCY_LEVELS):
+    # (任务, 核心, 档位) 的执行时间和能耗表
+    num_levels = {len(levels) for levels in frequency_levels.values()}
+    if len(num_levels) != 1:
+        raise ValueError("every core needs the same number of frequency levels")
+
+    base = np.array([execution_times[task] for task in tasks], dtype=float)
+    scale = np.array([frequency_levels[core] for core in range(1, NUM_CORES + 1)], dtype=float)
+    frequency, voltage = scale[..., 0], scale[..., 1]
+    powers = np.array([CORE_POWERS[core] for core in range(1, NUM_CORES + 1)], dtype=float)
+
+    times = base[:, :, None] / frequency[None]
+    energy = (powers[:, None] * frequency * voltage ** 2)[None] * times
+    return {'index': {task: i for i, task in enumerate(tasks)}, 'time': times, 'energy': energy}
+
+
+def place_task_dvfs(location, core=None, level=0):
+    details = place_task(location, core)
+    if location == 'core':
+        details['level'] = level
+    return details
+
+
+def effective_execution_times(scheduled_tasks, execution_times, tables):
+    # 把每个核心任务所选档位的执行时间代入，retime_schedule 等函数即可原样使用
+    effective = dict(execution_times)
+    for task, details in scheduled_tasks.items():
+        if details['location'] == 'core' and details.get('level', 0):
+            effective[task] = list(tables['time'][tables['index'][task], :, details['level']])
+    return effective
+
+
+def compute_energy_dvfs(scheduled_tasks, T_send, T_receive, tables):
+    rows, cores, levels = [], [], []
+    cloud_energy = 0.0
+    for task, details in scheduled_tasks.items():
+        if details['location'] == 'core':
+            rows.append(tables['index'][task])
+            cores.append(details['core'] - 1)
+            levels.append(details.get('level', 0))
+        else:
+            cloud_energy += RF_POWER * task_time(T_send, task) + RF_POWER * task_time(T_receive, task)
+    core_energy = tables['energy'][rows, cores, levels].sum() if rows else 0.0
+    return float(core_energy) + cloud_energy
+
+
+def ranked_dvfs_targets(tables, tasks, T_send, T_receive):
+    num_levels = tables['energy'].shape[2]
+    ranked = {}
+    for task in tasks:
+        energy = tables['energy'][tables['index'][task]]
+        targets = [(energy[core - 1, level], 'core', core, level)
+                   for core in range(1, NUM_CORES + 1) for level in range(num_levels)]
+        targets.append((RF_POWER * task_time(T_send, task) + RF_POWER * task_time(T_receive, task), 'cloud', None, None))
+        ranked[task] = sorted(targets, key=lambda target: target[0])
+    return ranked
+
+
+def migrate_tasks_dvfs(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max,
+                       frequency_levels=FREQUENCY_LEVELS, tasks=None, slack_pruning=True):
+    """
+    migrate_tasks where a core target also picks a frequency level, so a move can
+    change where a task runs, how fast, or both. Energies come from the vectorized
+    (task, core, level) table; candidates are visited cheapest-first with the same
+    energy bound and slack-index rejection as migrate_tasks. slack_pruning=False
+    re-times every candidate instead, which must give the same result.
+    """
+    order = sequence_order(G, scheduled_tasks)
+    tables = build_dvfs_tables(execution_times, order, frequency_levels)
+    final_schedule = copy_schedule(scheduled_tasks)
+    effective = effective_execution_times(final_schedule, execution_times, tables)
+    best_time = retime_schedule(G, final_schedule, effective, T_send, T_cloud, T_receive, order)
+    best_energy = compute_energy_dvfs(final_schedule, T_send, T_receive, tables)
+    slack_index = build_slack_index(G, final_schedule, effective, T_send, T_cloud, T_receive, T_max, order)
+    tasks = list(final_schedule) if tasks is None else tasks
+    ranked = ranked_dvfs_targets(tables, tasks, T_send, T_receive)
+
+    for task in tasks:
+        current = final_schedule[task]
+        current_energy = compute_energy_dvfs({task: current}, T_send, T_receive, tables)
+        current_target = (current['location'], current.get('core'),
+                          current.get('level', 0) if current['location'] == 'core' else None)
+        base_energy = best_energy - current_energy
+        best = None
+
+        for target_energy, location, core, level in ranked[task]:
+            energy = base_energy + target_energy
+            if energy > best_energy:
+                break
+            if (location, core, level) == current_target:
+                continue
+
+            candidate_times = dict(effective)
+            if location == 'core':
+                candidate_times[task] = list(tables['time'][tables['index'][task], :, level])
+            if slack_pruning and exceeds_slack(slack_index, final_schedule, task, location, core, candidate_times,
+                                               T_send, T_cloud, T_receive, T_max):
+                continue
+            candidate = copy_schedule(final_schedule)
+            candidate[task] = place_task_dvfs(location, core, level)
+            critical_time = retime_schedule(G, candidate, candidate_times, T_send, T_cloud, T_receive, order)
+            if critical_time > T_max:
+                continue
+            if energy < best_energy or (energy == best_energy and critical_time < best_time):
+                best = (candidate, candidate_times)
+                best_energy, best_time = energy, critical_time
+
+        if best is not None:
+            final_schedule, effective = best
+            slack_index = build_slack_index(G, final_schedule, effective, T_send, T_cloud, T_receive, T_max, order)
+
+    return final_schedule
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+    T_max = 39
+    order = list(nx.topological_sort(G))
+    tables = build_dvfs_tables(execution_times, order)
+
+    initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+    fixed = migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+    scaled = migrate_tasks_dvfs(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+    # 松弛剪枝只能跳过不可行的候选，结果必须与逐个重新计时完全相同
+    assert scaled == migrate_tasks_dvfs(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max,
+                                        slack_pruning=False), "slack pruning changed the DVFS result"
+
+    print(f"Fixed frequency: T_total = {max(d['finish_time'] for d in fixed.values())}, "
+          f"Energy = {compute_energy(fixed, execution_times, T_send, T_receive)[2]}")
+    print(f"DVFS: T_total = {max(d['finish_time'] for d in scaled.values()):.2f}, "
+          f"Energy = {compute_energy_dvfs(scaled, T_send, T_receive, tables):.2f}")
+    for task, details in scaled.items():
+        if details['location'] == 'core' and details['level']:
+            print(f"Task {task}: Core {details['core']}, Level {details['level']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import importlib
+import time
+
+import networkx as nx
+
+from Example5_Final import compute_energy, task_time
+from migration import (migrate_tasks, migrate_until_converged, place_task, ranked_targets,
+                       retime_schedule, sequence_order)
+
+MAX_EXACT_TASKS = 25
+
+
+def branch_and_bound(G, execution_times, T_send, T_cloud, T_receive, T_max, initial_schedule=None,
+                     max_tasks=MAX_EXACT_TASKS):
+    """
+    Exact minimum-energy assignment under T_max (ties broken by makespan), using the
+    timing rules of retime_schedule. Tasks are assigned one at a time in a fixed
+    dispatch order, so the times of the assigned prefix are final. With an
+    initial_schedule that order is its sequence_order, the seed keeps its own timing
+    and is the starting incumbent, so the result is never worse than the seed; without
+    one it is plain topological order. The optimum is over assignments for that
+    order (searching every per-resource sequence as well does not finish at 20
+    tasks). Branches are cut by an energy lower bound, by a makespan lower bound
+    against T_max, and by memoized partial states that were already reached with no
+    more energy. Returns None when no assignment meets T_max.
+    """
+    order = list(nx.topological_sort(G)) if initial_schedule is None else sequence_order(G, initial_schedule)
+    if len(order) > max_tasks:
+        raise ValueError(f"branch_and_bound is limited to {max_tasks} tasks, got {len(order)}")
+
+    n = len(order)
+    position = {task: i for i, task in enumerate(order)}
+    ranked = ranked_targets(execution_times, T_send, T_receive, order)
+    preds = {task: list(G.predecessors(task)) for task in order}
+
+    min_energy_suffix = [0] * (n + 1)
+    for k in range(n - 1, -1, -1):
+        min_energy_suffix[k] = min_energy_suffix[k + 1] + ranked[order[k]][0][0]
+
+    # 后继链的最短剩余时间（任何位置选择下都至少需要这么久）
+    min_tail = {}
+    succ_min_tail = {}
+    send_time = {task: task_time(T_send, task) for task in order}
+    cloud_time = {task: send_time[task] + task_time(T_cloud, task) + task_time(T_receive, task) for task in order}
+    for task in reversed(order):
+        succ_min_tail[task] = max((min_tail[succ] for succ in G.successors(task)), default=0)
+        min_tail[task] = min(
+            [t + succ_min_tail[task] for t in execution_times[task]] +
+            [max(cloud_time[task], send_time[task] + succ_min_tail[task])]
+        )
+
+    # 第 k 步时仍有未分配后继的已分配任务，它们的 release 时间决定了后续调度
+    last_succ = {task: max((position[succ] for succ in G.successors(task)), default=-1) for task in order}
+    frontier = [[task for task in order[:k] if last_succ[task] >= k] for k in range(n + 1)]
+
+    best = {'energy': float('inf'), 'time': float('inf'), 'assignment': None}
+    if initial_schedule is not None:
+        schedule = {task: place_task(d['location'], d.get('core')) for task, d in initial_schedule.items()}
+        critical_time = retime_schedule(G, schedule, execution_times, T_send, T_cloud, T_receive, order)
+        if critical_time <= T_max:
+            best['energy'] = compute_energy(schedule, execution_times, T_send, T_receive)[2]
+            best['time'] = critical_time
+            best['assignment'] = {task: (d['location'], d.get('core')) for task, d in schedule.items()}
+
+    memo = {}
+    release = {}
+    assignment = {}
+
+    def search(k, cores, wireless_sending, energy, makespan):
+        if k == n:
+            if (energy, makespan) < (best['energy'], best['time']):
+                best.update(energy=energy, time=makespan, assignment=dict(assignment))
+            return
+
+        lower_bound = energy + min_energy_suffix[k]
+        if lower_bound > best['energy'] or (lower_bound == best['energy'] and makespan >= best['time']):
+            return
+
+        key = (k, cores, wireless_sending, tuple(release[task] for task in frontier[k]))
+        seen = memo.get(key)
+        if seen is not None and seen <= (energy, makespan):
+            return
+        memo[key] = (energy, makespan)
+
+        task = order[k]
+        ready_time = max((release[pred] for pred in preds[task]), default=0)
+        for target_energy, location, core in ranked[task]:
+            if location == 'core':
+                finish_time = release_time = max(ready_time, cores[core - 1]) + execution_times[task][core - 1]
+                next_cores = cores[:core - 1] + (finish_time,) + cores[core:]
+                next_wireless = wireless_sending
+            else:
+                start_sending = max(wireless_sending, ready_time)
+                release_time = next_wireless = start_sending + send_time[task]
+                finish_time = start_sending + cloud_time[task]
+                next_cores = cores
+            if finish_time > T_max or release_time + succ_min_tail[task] > T_max:
+                continue
+
+            release[task] = release_time
+            assignment[task] = (location, core)
+            search(k + 1, next_cores, next_wireless, energy + target_energy, max(makespan, finish_time))
+
+        release.pop(task, None)
+        assignment.pop(task, None)
+
+    search(0, (0, 0, 0), 0, 0, 0)
+
+    if best['assignment'] is None:
+        return None
+    schedule = {task: place_task(*best['assignment'][task]) for task in G.nodes()}
+    retime_schedule(G, schedule, execution_times, T_send, T_cloud, T_receive, order)
+    return schedule
+
+
+def main():
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    for example, T_max in ((2, 27), (3, 38), (4, 36), (5, 39)):
+        module = importlib.import_module(f'Example{example}_Final')
+        G, execution_times = module.create_task_graph()
+        initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+
+        results = []
+        for name, optimizer in (('Single pass', migrate_tasks), ('Converged', migrate_until_converged)):
+            start = time.perf_counter()
+            schedule = optimizer(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+            results.append((name, schedule, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        schedule = branch_and_bound(G, execution_times, T_send, T_cloud, T_receive, T_max, results[-1][1])
+        results.append(('Exact', schedule, time.perf_counter() - start))
+
+        for name, schedule, elapsed in results:
+            critical_time = max(details['finish_time'] for details in schedule.values())
+            total_energy = compute_energy(schedule, execution_times, T_send, T_receive)[2]
+            print(f"Example {example} {name}: T_total = {critical_time}, Energy = {total_energy}, "
+                  f"Time = {elapsed:.3f}s")
+
+        # 以启发式结果为初始解时，精确解不会比它差
+        energies = [compute_energy(schedule, execution_times, T_send, T_receive)[2] for _, schedule, _ in results]
+        assert energies[-1] <= energies[-2], "branch_and_bound is worse than its seed"
+
+
+if __name__ == '__main__':
+    main()
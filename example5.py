@@ -1,3 +1,4 @@
+import heapq
 import matplotlib.pyplot as plt
 import networkx as nx
 import os
@@ -26,7 +27,7 @@ def create_task_graph():
     return G, execution_times
 
 # Step 2: Compute task priorities based on critical path
-def compute_priorities(G, execution_times):
+def compute_priority_values(G, execution_times):
     priorities = {}
     successors = {node: list(G.successors(node)) for node in G.nodes()}
 
@@ -40,20 +41,30 @@ def compute_priorities(G, execution_times):
     for task in G.nodes():
         calculate_priority(task)
 
+    return priorities
+
+def compute_priorities(G, execution_times):
+    priorities = compute_priority_values(G, execution_times)
     # Return tasks sorted by priority in descending order
     return sorted(priorities.keys(), key=lambda x: priorities[x], reverse=True)
 
 # Step 3: Initial Scheduling Algorithm
-def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
+def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive, priorities=None):
     scheduled_tasks = {}
     cores = [0, 0, 0]
     wireless_sending = 0
     wireless_receiving = 0
 
-    # Compute task priorities
-    task_order = compute_priorities(G, execution_times)
+    # Ready list: a task enters the heap once all its predecessors are scheduled
+    if priorities is None:
+        priorities = compute_priority_values(G, execution_times)
+    rank = {task: i for i, task in enumerate(priorities)}  # ties keep insertion order
+    remaining_preds = {task: G.in_degree(task) for task in G.nodes()}
+    ready_heap = [(-priorities[task], rank[task], task) for task in G.nodes() if remaining_preds[task] == 0]
+    heapq.heapify(ready_heap)
 
-    for task in task_order:
+    while ready_heap:
+        _, _, task = heapq.heappop(ready_heap)
         preds = list(G.predecessors(task))
         ready_time = 0
         for pred in preds:
@@ -90,6 +101,11 @@ def initial_scheduling(G, execution_times, T_send, T_cloud, T_receive):
             }
             cores[best_core] = local_finish_time
 
+        for succ in G.successors(task):
+            remaining_preds[succ] -= 1
+            if remaining_preds[succ] == 0:
+                heapq.heappush(ready_heap, (-priorities[succ], rank[succ], succ))
+
     return scheduled_tasks
 
 # Step 4: Visualize Initial Scheduling
@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import csv
+import importlib
+import itertools
+import json
+import os
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from graph_cache import graph_data
+from memory_profile import format_memory_report, memory_phase
+from metaheuristic import genetic_optimization
+from migration import CORE_POWERS, RF_POWER, migrate_tasks, migrate_until_converged
+from partitioned import partitioned_migration, random_layered_graph
+from rendering import render_schedule, submit_renders
+from trace_export import export_chrome_trace
+
+OPTIMIZERS = ('none', 'task_migration_optimized', 'migrate_tasks', 'migrate_until_converged', 'genetic',
+              'partitioned')
+# 这些字段给出列表时展开成任务矩阵（取笛卡尔积）
+MATRIX_FIELDS = (('graph', 'source'), ('timing', 'T_send'), ('timing', 'T_cloud'), ('timing', 'T_receive'),
+                 ('optimizer', 'T_max'), ('optimizer', 'name'), ('platform', 'rf_power'))
+DEFAULT_FOLDER = 'results/{graph}_{optimizer}_Tmax{T_max}_{T_send}-{T_cloud}-{T_receive}_rf{rf_power}'
+
+
+def load_config(path):
+    # .toml 或 .json 实验配置
+    with open(path, 'rb') as f:
+        return tomllib.load(f) if path.endswith('.toml') else json.load(f)
+
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def graph_name(source):
+    if isinstance(source, str):
+        return source
+    if 'name' in source or 'module' in source:
+        return source.get('name', source.get('module'))
+    return f"random_{source['num_tasks']}_{source['num_levels']}_{source.get('seed', 0)}"
+
+
+def expand_jobs(config):
+    """
+    One job per point of the product of all list-valued MATRIX_FIELDS. A graph source
+    is an Example module name (with create_task_graph), a table with `module`, or a
+    table with num_tasks / num_levels / edges_per_task / seed for random_layered_graph;
+    a table may carry its own T_max, used when the optimizer section gives none.
+    Platform powers other than the defaults are rejected for task_migration_optimized,
+    which has them built in. Two jobs whose outputs.folder resolves to the same path
+    would overwrite each other's files, so that is rejected too.
+    """
+    sections = {name: dict(config.get(name, {})) for name in ('graph', 'timing', 'platform', 'optimizer', 'outputs')}
+    unknown = set(as_list(sections['optimizer'].get('name', 'migrate_tasks'))) - set(OPTIMIZERS)
+    if unknown:
+        raise ValueError(f"unknown optimizer {sorted(unknown)}")
+
+    defaults = {('timing', 'T_send'): 3, ('timing', 'T_cloud'): 1, ('timing', 'T_receive'): 1,
+                ('optimizer', 'T_max'): None, ('optimizer', 'name'): 'migrate_tasks', ('platform', 'rf_power'): RF_POWER}
+    values = [as_list(sections[section].get(key, defaults.get((section, key)))) for section, key in MATRIX_FIELDS]
+    # 功率参数用于能耗报告和各优化器的迁移决策；task_migration_optimized 内部固定使用默认功率
+    core_powers = {int(core): power for core, power in sections['platform'].get('core_powers', CORE_POWERS).items()}
+    outputs = sections['outputs']
+    if 'task_migration_optimized' in as_list(sections['optimizer'].get('name', 'migrate_tasks')) and (
+            core_powers != CORE_POWERS or set(as_list(sections['platform'].get('rf_power', RF_POWER))) != {RF_POWER}):
+        raise ValueError("task_migration_optimized only supports the default core_powers and rf_power")
+
+    jobs = []
+    for source, T_send, T_cloud, T_receive, T_max, optimizer, rf_power in itertools.product(*values):
+        if T_max is None:
+            T_max = source.get('T_max') if isinstance(source, dict) else None
+        if T_max is None:
+            raise ValueError(f"no T_max for graph {graph_name(source)}")
+        job = {'graph': source, 'T_send': T_send, 'T_cloud': T_cloud, 'T_receive': T_receive, 'T_max': T_max,
+               'optimizer': optimizer, 'core_powers': core_powers, 'rf_power': rf_power,
+               'options': sections['optimizer'].get('options', {}), 'cache_dir': config.get('cache_dir'),
+               'files': outputs.get('files', ['scheduling.txt', 'energy_report.txt'])}
+        job['folder'] = outputs.get('folder', DEFAULT_FOLDER).format(
+            graph=graph_name(source), optimizer=optimizer, T_max=T_max, T_send=T_send, T_cloud=T_cloud,
+            T_receive=T_receive, rf_power=rf_power)
+        jobs.append(job)
+
+    folders = {}
+    for job in jobs:
+        other = folders.setdefault(job['folder'], job)
+        if other is not job:
+            raise ValueError(f"jobs for {graph_name(other['graph'])} and {graph_name(job['graph'])} both write to "
+                             f"{job['folder']}; add the differing fields to outputs.folder")
+    return jobs
+
+
+def load_graph(source):
+    if isinstance(source, str) or 'module' in source:
+        module = importlib.import_module(source if isinstance(source, str) else source['module'])
+        return module, *module.create_task_graph()
+    module = importlib.import_module('Example5_Final')
+    return module, *random_layered_graph(source['num_tasks'], source['num_levels'],
+                                         source.get('edges_per_task', 2), source.get('seed', 0))
+
+
+def write_scheduling_table(schedule, path):
+    # 与 Example*_Final.py main 中的 scheduling.txt 格式相同
+    with open(path, 'w') as f:
+        f.write("=== Task Scheduling Table ===\n")
+        f.write(f"{'Task':<6} {'Start Time':<12} {'Finish Time':<12} {'Location':<10} {'Core':<6}\n")
+        for task, details in schedule.items():
+            start_time = details.get('start_time', '-')
+            finish_time = details['finish_time']
+            location = details['location'].capitalize()
+            core = details.get('core', '-')
+            f.write(f"{task:<6} {start_time:<12} {finish_time:<12} {location:<10} {core:<6}\n")
+
+
+def write_energy_report(energy, path):
+    core_energy, cloud_energy, total_energy = energy
+    with open(path, 'w') as f:
+        f.write("=== Energy Consumption Report ===\n")
+        for core in sorted(core_energy):
+            f.write(f"Core {core} Energy: {core_energy[core]}\n")
+        f.write(f"Cloud Energy: {cloud_energy}\n")
+        f.write(f"Total Energy: {total_energy}\n")
+
+
+def run_job(job):
+    # 工作进程入口：生成任务图、初始调度、优化并写出配置中要求的输出文件；
+    # PNG 不在这里绘制，而是作为绘图任务返回，由 run_experiment 另行提交
+    module, G, execution_times = load_graph(job['graph'])
+    T_send, T_cloud, T_receive, T_max = job['T_send'], job['T_cloud'], job['T_receive'], job['T_max']
+    options = job['options']
+    start = time.perf_counter()
+
+    # SCHEDULE_MEMPROFILE=1 时记录各阶段的内存，写入输出目录的 memory.txt
+    memory_report = []
+    data = graph_data(G, execution_times, names=('priorities', 'order'), cache_dir=job['cache_dir'])
+    with memory_phase(memory_report, 'initial_scheduling'):
+        initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive,
+                                                     priorities=data['priorities'])
+    optimizer = job['optimizer']
+    with open(os.devnull, 'w') as sink, memory_phase(memory_report, optimizer):
+        if optimizer == 'none':
+            schedule = initial_schedule
+        elif optimizer == 'task_migration_optimized':
+            with contextlib.redirect_stdout(sink):
+                schedule = module.task_migration_optimized(G, initial_schedule, execution_times, T_send, T_cloud,
+                                                           T_receive, T_max)
+        elif optimizer == 'migrate_tasks':
+            schedule = migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max,
+                                     order=data['order'], core_powers=job['core_powers'], rf_power=job['rf_power'])
+        elif optimizer == 'migrate_until_converged':
+            schedule = migrate_until_converged(G, initial_schedule, execution_times, T_send, T_cloud, T_receive,
+                                               T_max, order=data['order'], core_powers=job['core_powers'],
+                                               rf_power=job['rf_power'])
+        elif optimizer == 'genetic':
+            schedule = genetic_optimization(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max,
+                                            core_powers=job['core_powers'], rf_power=job['rf_power'], **options)
+        else:
+            schedule = partitioned_migration(G, initial_schedule, execution_times, T_send, T_cloud, T_receive,
+                                             T_max, workers=1, core_powers=job['core_powers'],
+                                             rf_power=job['rf_power'], **options)
+    elapsed = time.perf_counter() - start
+
+    energy = module.compute_energy(schedule, execution_times, T_send, T_receive, job['core_powers'], job['rf_power'])
+    os.makedirs(job['folder'], exist_ok=True)
+    renders = []
+    for name in job['files']:
+        path = os.path.join(job['folder'], name)
+        if name.endswith('.png'):
+            renders.append((schedule, T_send, T_cloud, T_receive, path))
+        elif name.endswith('.json'):
+            export_chrome_trace(schedule, T_send, T_cloud, T_receive, path)
+        elif name.startswith('energy'):
+            write_energy_report(energy, path)
+        else:
+            write_scheduling_table(schedule, path)
+    if memory_report:
+        with open(os.path.join(job['folder'], 'memory.txt'), 'w') as f:
+            f.write(format_memory_report(memory_report) + "\n")
+
+    row = {'graph': graph_name(job['graph']), 'optimizer': optimizer, 'T_max': T_max, 'T_send': T_send,
+           'T_cloud': T_cloud, 'T_receive': T_receive, 'rf_power': job['rf_power'],
+           'T_total': max(details['finish_time'] for details in schedule.values()), 'Energy': energy[2],
+           'Time': round(elapsed, 4), 'folder': job['folder']}
+    return row, renders
+
+
+def run_experiment(config, workers=None):
+    """
+    Expands the config into jobs and runs them on a process pool (workers=1 runs them
+    in this process). Figures are rendered on the same pool as each job finishes, so
+    they overlap with the remaining optimizer jobs. Returns one summary row per job,
+    in job order, and writes them to the outputs.summary CSV path if the config gives one.
+    """
+    jobs = expand_jobs(config)
+    workers = config.get('workers', os.cpu_count()) if workers is None else workers
+    if workers == 1 or len(jobs) == 1:
+        rows = []
+        for job in jobs:
+            row, renders = run_job(job)
+            for render in renders:
+                render_schedule(*render)
+            rows.append(row)
+    else:
+        rows = [None] * len(jobs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_job, job): i for i, job in enumerate(jobs)}
+            render_futures = []
+            for future in as_completed(futures):
+                rows[futures[future]], renders = future.result()
+                render_futures += submit_renders(pool, renders)
+            for future in render_futures:
+                future.result()
+
+    summary = config.get('outputs', {}).get('summary')
+    if summary and rows:
+        os.makedirs(os.path.dirname(summary) or '.', exist_ok=True)
+        with open(summary, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an experiment matrix from a TOML/JSON config.")
+    parser.add_argument('config')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    for row in run_experiment(load_config(args.config), args.workers):
+        print(f"{row['graph']} {row['optimizer']} T_max = {row['T_max']} "
+              f"(T_send = {row['T_send']}, T_cloud = {row['T_cloud']}, T_receive = {row['T_receive']}): "
+              f"T_total = {row['T_total']}, Energy = {row['Energy']}, Time = {row['Time']}s -> {row['folder']}")
+
+
+if __name__ == '__main__':
+    main()
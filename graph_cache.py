@@ -0,0 +1,138 @@
+import hashlib
+import os
+import pickle
+import time
+
+import networkx as nx
+
+from Example5_Final import compute_priority_values, create_task_graph, initial_scheduling
+from telemetry import inc
+
+DEFAULT_CACHE_DIR = os.environ.get('SCHEDULE_CACHE_DIR', '.schedule_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 可缓存的数据项，按计算依赖排列（levels / reachability 需要 order）
+GRAPH_DATA = ('priorities', 'order', 'levels', 'reachability')
+
+
+def graph_fingerprint(G, execution_times):
+    """
+    SHA-256 of the nodes, edges and execution time table. Node and successor order are
+    part of the key: compute_priority_values and nx.topological_sort break ties by
+    insertion order, so graphs that differ only in order can yield different schedules.
+    """
+    digest = hashlib.sha256()
+    for node in G.nodes():
+        digest.update(repr((node, list(execution_times[node]), list(G.successors(node)))).encode())
+    return digest.hexdigest()
+
+
+def compute_levels(G, order):
+    # 层级：从入口任务出发的最长路径边数，同一层内的任务互不依赖
+    levels = {}
+    for task in order:
+        levels[task] = max((levels[pred] + 1 for pred in G.predecessors(task)), default=0)
+    return levels
+
+
+def compute_reachability(G, order):
+    # 每个任务的后代集合，以拓扑序位置为位的整数位图表示
+    position = {task: i for i, task in enumerate(order)}
+    descendants = {}
+    for task in reversed(order):
+        bits = 0
+        for succ in G.successors(task):
+            bits |= descendants[succ] | (1 << position[succ])
+        descendants[task] = bits
+    return descendants
+
+
+def derive(G, execution_times, name, data):
+    if name == 'priorities':
+        return compute_priority_values(G, execution_times)
+    if name == 'order':
+        return list(nx.topological_sort(G))
+    if name == 'levels':
+        return compute_levels(G, data['order'])
+    return compute_reachability(G, data['order'])
+
+
+def evict(cache_dir, max_bytes):
+    # 超过 max_bytes 时按最近使用时间从旧到新删除
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith('.pkl'):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def graph_data(G, execution_times, names=('priorities', 'order', 'levels'), cache_dir=DEFAULT_CACHE_DIR,
+               max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Graph-derived data for G, one pickle per item in cache_dir keyed by graph_fingerprint.
+    names can include 'priorities' (compute_priority_values), 'order' (topological
+    order), 'levels' and 'reachability' (descendant bitsets over order positions).
+    Missing items are computed and stored; the cache is trimmed to max_bytes by
+    least recent use. cache_dir=None disables the cache.
+    """
+    unknown = set(names) - set(GRAPH_DATA)
+    if unknown:
+        raise ValueError(f"unknown graph data {sorted(unknown)}")
+    needed = set(names) | ({'order'} if {'levels', 'reachability'} & set(names) else set())
+    key = graph_fingerprint(G, execution_times)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    data = {}
+    stored = False
+    for name in sorted(needed, key=GRAPH_DATA.index):
+        path = os.path.join(cache_dir, f'{key}-{name}.pkl') if cache_dir is not None else None
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                data[name] = pickle.load(f)
+            os.utime(path)
+            inc('schedule_graph_cache_total', result='hit')
+            continue
+        if path is not None:
+            inc('schedule_graph_cache_total', result='miss')
+        data[name] = derive(G, execution_times, name, data)
+        if path is not None:
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data[name], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            stored = True
+
+    if stored:
+        evict(cache_dir, max_bytes)
+    return {name: data[name] for name in names}
+
+
+def main():
+    # checkpoint（由 migration 导入）依赖本模块的 graph_fingerprint，这里延迟导入以免循环导入
+    from migration import migrate_tasks
+
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    for run in ('cold', 'warm'):
+        start = time.perf_counter()
+        data = graph_data(G, execution_times)
+        preprocessing = time.perf_counter() - start
+        for T_max in (30, 35, 39):
+            initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive,
+                                                  priorities=data['priorities'])
+            schedule = migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max,
+                                     order=data['order'])
+            print(f"{run} T_max = {T_max}: T_total = {max(d['finish_time'] for d in schedule.values())}")
+        print(f"{run} preprocessing: {preprocessing * 1000:.2f} ms, levels = {max(data['levels'].values()) + 1}")
+
+
+if __name__ == '__main__':
+    main()
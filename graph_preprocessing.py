@@ -0,0 +1,66 @@
+import networkx as nx
+
+from graph_cache import compute_reachability
+
+
+def dedupe_edges(edges):
+    # 原始边列表中的重复边只保留第一次出现（nx.DiGraph 本身也会合并重复边）
+    seen = set()
+    unique = []
+    for edge in edges:
+        if edge not in seen:
+            seen.add(edge)
+            unique.append(edge)
+    return unique
+
+
+def redundant_edges(G, order=None, reachability=None):
+    """
+    Edges (u, v) where v is also reachable from u through another successor. Such an
+    edge never decides v's ready time: the intermediate predecessor releases v no earlier
+    than u does (its start is after u's release, and it releases at its finish or
+    start_time_cloud). Priorities and topological order are unchanged by removing it.
+    """
+    order = list(nx.topological_sort(G)) if order is None else order
+    reachability = compute_reachability(G, order) if reachability is None else reachability
+    position = {task: i for i, task in enumerate(order)}
+
+    redundant = []
+    for u in G.nodes():
+        reachable = 0
+        for w in G.successors(u):
+            reachable |= reachability[w]
+        redundant.extend((u, v) for v in G.successors(u) if reachable >> position[v] & 1)
+    return redundant
+
+
+def reduce_task_graph(G, order=None, reachability=None, keep_data=True):
+    """
+    Copy of G without redundant edges, keeping node order, successor order and
+    attributes so schedules on the reduced graph are identical. Edges carrying a
+    'data_size' are kept when keep_data is set, since cloud_time_tables charges their
+    transfer to the endpoint tasks.
+    """
+    removed = set(redundant_edges(G, order, reachability))
+    if keep_data:
+        removed = {(u, v) for u, v in removed if 'data_size' not in G.edges[u, v]}
+
+    reduced = nx.DiGraph()
+    reduced.graph.update(G.graph)
+    reduced.add_nodes_from(G.nodes(data=True))
+    reduced.add_edges_from((u, v, data) for u, v, data in G.edges(data=True) if (u, v) not in removed)
+    return reduced
+
+
+def main():
+    import importlib
+
+    for example in (2, 3, 4, 5):
+        G, _ = importlib.import_module(f'Example{example}_Final').create_task_graph()
+        reduced = reduce_task_graph(G)
+        removed = sorted(set(G.edges()) - set(reduced.edges()))
+        print(f"Example {example}: {G.number_of_edges()} -> {reduced.number_of_edges()} edges, removed {removed}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import importlib
+
+from channels import new_timeline, timeline_earliest_slot, timeline_reserve
+from Example5_Final import compute_energy, compute_priorities, task_time
+from migration import compute_ready_time
+
+
+def new_core_timelines(execution_times, num_cores=3):
+    # 短于该核心上最短任务的空闲区间永远填不进任务，建时间轴时直接丢弃
+    return [new_timeline(min(times[i] for times in execution_times.values())) for i in range(num_cores)]
+
+
+def _insert_on_core(timelines, task, ready_time, execution_times):
+    slots = [timeline_earliest_slot(timelines[i], ready_time, execution_times[task][i]) for i in range(len(timelines))]
+    core_times = [slots[i] + execution_times[task][i] for i in range(len(timelines))]
+    best_core = core_times.index(min(core_times))
+    return best_core, slots[best_core], core_times[best_core]
+
+
+def initial_scheduling_insertion(G, execution_times, T_send, T_cloud, T_receive):
+    """
+    initial_scheduling with insertion-based cores (as in HEFT): each core keeps an
+    index of its idle gaps and a task goes into the earliest gap it fits in, instead
+    of only after the last task on the core. The cloud side is unchanged.
+    """
+    scheduled_tasks = {}
+    timelines = new_core_timelines(execution_times)
+    wireless_sending = 0
+
+    for task in compute_priorities(G, execution_times):
+        ready_time = compute_ready_time(G, scheduled_tasks, task)
+        best_core, local_start_time, local_finish_time = _insert_on_core(timelines, task, ready_time, execution_times)
+
+        start_sending = max(wireless_sending, ready_time)
+        start_cloud = start_sending + task_time(T_send, task)
+        finish_cloud = start_cloud + task_time(T_cloud, task)
+        cloud_finish_time = finish_cloud + task_time(T_receive, task)
+
+        if cloud_finish_time < local_finish_time:
+            scheduled_tasks[task] = {
+                'ready_time': ready_time,
+                'start_time': start_sending,
+                'finish_time': cloud_finish_time,
+                'location': 'cloud',
+                'start_time_cloud': start_cloud,
+                'finish_time_cloud': finish_cloud
+            }
+            wireless_sending = start_cloud
+        else:
+            scheduled_tasks[task] = {
+                'ready_time': ready_time,
+                'start_time': local_start_time,
+                'finish_time': local_finish_time,
+                'location': 'core',
+                'core': best_core + 1
+            }
+            timeline_reserve(timelines[best_core], local_start_time, execution_times[task][best_core])
+
+    return scheduled_tasks
+
+
+def recalculate_schedule_times_insertion(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive):
+    # 位置固定，按优先级顺序重新插空计时（recalculate_schedule_times 的插空版本）
+    timelines = new_core_timelines(execution_times)
+    wireless_sending = 0
+
+    for node in compute_priorities(G, execution_times):
+        details = scheduled_tasks[node]
+        ready_time = compute_ready_time(G, scheduled_tasks, node)
+
+        if details['location'] == 'core':
+            core = details['core'] - 1
+            start_time = timeline_earliest_slot(timelines[core], ready_time, execution_times[node][core])
+            finish_time = start_time + execution_times[node][core]
+            timeline_reserve(timelines[core], start_time, execution_times[node][core])
+        else:
+            start_time = max(wireless_sending, ready_time)
+            details['start_time_cloud'] = start_time + task_time(T_send, node)
+            details['finish_time_cloud'] = details['start_time_cloud'] + task_time(T_cloud, node)
+            finish_time = details['finish_time_cloud'] + task_time(T_receive, node)
+            wireless_sending = details['start_time_cloud']
+
+        details['ready_time'] = ready_time
+        details['start_time'] = start_time
+        details['finish_time'] = finish_time
+
+
+def main():
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    for example in range(2, 6):
+        module = importlib.import_module(f'Example{example}_Final')
+        G, execution_times = module.create_task_graph()
+
+        for name, scheduler in (('Append', module.initial_scheduling), ('Insertion', initial_scheduling_insertion)):
+            schedule = scheduler(G, execution_times, T_send, T_cloud, T_receive)
+            critical_time = max(details['finish_time'] for details in schedule.values())
+            total_energy = compute_energy(schedule, execution_times, T_send, T_receive)[2]
+            print(f"Example {example} {name}: T_total = {critical_time}, Energy = {total_energy}")
+
+
+if __name__ == '__main__':
+    main()
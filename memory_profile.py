@@ -0,0 +1,90 @@
+import argparse
+import contextlib
+import importlib
+import os
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+
+# 默认关闭；SCHEDULE_MEMPROFILE=1（对 experiments.run_job 的各阶段生效）或 memory_phase(..., enabled=True) 时才启用 tracemalloc
+MEMPROFILE = os.environ.get('SCHEDULE_MEMPROFILE') == '1'
+
+
+@contextmanager
+def memory_phase(report, name, top=5, enabled=None):
+    """
+    Records the tracemalloc peak of the enclosed block, the memory it still holds at the
+    end, and its `top` allocation sites (by line, net of what existed before the block)
+    as one entry of `report`. Does nothing unless profiling is enabled.
+    """
+    if not (MEMPROFILE if enabled is None else enabled):
+        yield
+        return
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        sites = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+        report.append({
+            'phase': name,
+            'peak': peak - base,
+            'retained': current - base,
+            'top': [(str(stat.traceback[0]), stat.size_diff, stat.count_diff) for stat in sites[:top]],
+        })
+        if started:
+            tracemalloc.stop()
+
+
+def format_memory_report(report):
+    lines = []
+    for entry in report:
+        lines.append(f"{entry['phase']}: Peak = {entry['peak'] / 1024:.1f} KiB, "
+                     f"Retained = {entry['retained'] / 1024:.1f} KiB")
+        for site, size, count in entry['top']:
+            lines.append(f"    {site}: {size / 1024:+.1f} KiB ({count:+d} blocks)")
+    return "\n".join(lines)
+
+
+def profile_example(module_name, top=5):
+    # 与 Example*_Final.py 的 main 相同的流程，按阶段记录内存
+    module = importlib.import_module(module_name)
+    T_send, T_cloud, T_receive = 3, 1, 1
+    report = []
+
+    # 输出丢弃到 os.devnull，并在阶段之外打开，避免把打印内容的缓冲计入峰值
+    with open(os.devnull, 'w') as sink, tempfile.TemporaryDirectory() as folder:
+        tracemalloc.start()
+        with memory_phase(report, 'create_task_graph', top, enabled=True):
+            G, execution_times = module.create_task_graph()
+        with memory_phase(report, 'initial_scheduling', top, enabled=True):
+            initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+        with memory_phase(report, 'task_migration_optimized', top, enabled=True), contextlib.redirect_stdout(sink):
+            optimized_schedule = module.task_migration_optimized(G, initial_schedule, execution_times,
+                                                                 T_send, T_cloud, T_receive)
+        with memory_phase(report, 'visualize_scheduling', top, enabled=True), contextlib.redirect_stdout(sink):
+            module.visualize_scheduling(optimized_schedule, execution_times, T_send, T_cloud, T_receive,
+                                        os.path.join(folder, 'scheduling.png'))
+        tracemalloc.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase peak memory of an example pipeline.")
+    parser.add_argument('--example', type=int, default=5, choices=(2, 3, 4, 5))
+    parser.add_argument('--top', type=int, default=5, help="allocation sites to list per phase")
+    args = parser.parse_args()
+
+    print(format_memory_report(profile_example(f'Example{args.example}_Final', args.top)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import importlib
+import time
+
+import networkx as nx
+import numpy as np
+
+from checkpoint import read_checkpoint, remove_checkpoint, run_key, write_checkpoint
+from Example5_Final import compute_energy, task_time
+from migration import (CORE_POWERS, NUM_CORES, RF_POWER, migrate_tasks, migrate_until_converged, place_task,
+                       retime_schedule, task_energy)
+
+CLOUD = NUM_CORES  # 编码：0..NUM_CORES-1 为核心，NUM_CORES 为云端
+
+
+def build_tables(G, execution_times, T_send, T_cloud, T_receive, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    order = list(nx.topological_sort(G))
+    position = {task: i for i, task in enumerate(order)}
+    energy_table = np.array([
+        [task_energy(task, place_task('core', core), execution_times, T_send, T_receive, core_powers, rf_power)
+         for core in range(1, NUM_CORES + 1)] +
+        [task_energy(task, place_task('cloud'), execution_times, T_send, T_receive, core_powers, rf_power)]
+        for task in order
+    ], dtype=float)
+    return {
+        'order': order,
+        'preds': [np.array([position[pred] for pred in G.predecessors(task)], dtype=int) for task in order],
+        'exec': np.array([execution_times[task] for task in order], dtype=float),
+        'energy': energy_table,
+        'T_send': np.array([task_time(T_send, task) for task in order], dtype=float),
+        'cloud_time': np.array([task_time(T_send, task) + task_time(T_cloud, task) + task_time(T_receive, task)
+                                for task in order], dtype=float),
+    }
+
+
+def encode_schedule(scheduled_tasks, tables):
+    return np.array([
+        CLOUD if scheduled_tasks[task]['location'] == 'cloud' else scheduled_tasks[task]['core'] - 1
+        for task in tables['order']
+    ], dtype=int)
+
+
+def decode_assignment(assignment, G, execution_times, T_send, T_cloud, T_receive, tables):
+    schedule = {}
+    for task, gene in zip(tables['order'], assignment):
+        schedule[task] = place_task('cloud') if gene == CLOUD else place_task('core', int(gene) + 1)
+    retime_schedule(G, schedule, execution_times, T_send, T_cloud, T_receive, tables['order'])
+    return {task: schedule[task] for task in G.nodes()}
+
+
+def evaluate_population(population, tables):
+    """
+    Makespan and energy of every row of a (population, N) assignment array, with
+    the timing rules of retime_schedule applied to all rows at once.
+    """
+    size, n = population.shape
+    rows = np.arange(size)
+    release = np.zeros((size, n))
+    cores = np.zeros((size, NUM_CORES))
+    wireless_sending = np.zeros(size)
+    makespan = np.zeros(size)
+
+    for k in range(n):
+        preds = tables['preds'][k]
+        ready_time = release[:, preds].max(axis=1) if len(preds) else np.zeros(size)
+        gene = population[:, k]
+        is_cloud = gene == CLOUD
+        core = np.minimum(gene, NUM_CORES - 1)
+
+        core_free = cores[rows, core]
+        core_finish = np.maximum(ready_time, core_free) + tables['exec'][k, core]
+        start_sending = np.maximum(wireless_sending, ready_time)
+
+        release[:, k] = np.where(is_cloud, start_sending + tables['T_send'][k], core_finish)
+        finish_time = np.where(is_cloud, start_sending + tables['cloud_time'][k], core_finish)
+        cores[rows, core] = np.where(is_cloud, core_free, core_finish)
+        wireless_sending = np.where(is_cloud, start_sending + tables['T_send'][k], wireless_sending)
+        makespan = np.maximum(makespan, finish_time)
+
+    energy = tables['energy'][np.arange(n), population].sum(axis=1)
+    return makespan, energy
+
+
+def genetic_optimization(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max,
+                         population_size=200, generations=200, mutation_rate=None, elite=4, seed=0,
+                         checkpoint=None, checkpoint_every=20, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    """
+    Genetic search over assignment vectors seeded from scheduled_tasks (normally the
+    initial_scheduling result). Fitness is energy plus a penalty proportional to how far
+    the makespan exceeds T_max, and the best feasible individual seen is returned
+    (scheduled_tasks itself if none is found). With a `checkpoint` path, the population,
+    best individual and generator state are saved every `checkpoint_every` generations
+    and resumed from, as in migrate_tasks. core_powers / rf_power replace the default
+    power constants in the fitness.
+    """
+    rng = np.random.default_rng(seed)
+    tables = build_tables(G, execution_times, T_send, T_cloud, T_receive, core_powers, rf_power)
+    n = len(tables['order'])
+    mutation_rate = 1.0 / n if mutation_rate is None else mutation_rate
+    penalty = tables['energy'].max() * n
+
+    seed_assignment = encode_schedule(scheduled_tasks, tables)
+    key = None
+    if checkpoint is not None:
+        key = run_key(G, execution_times, T_max, T_send, T_cloud, T_receive, population_size, mutation_rate, elite,
+                      seed, core_powers, rf_power, seed_assignment.tolist())
+    state = read_checkpoint(checkpoint, 'genetic_optimization', key)
+    if state is None:
+        population = np.tile(seed_assignment, (population_size, 1))
+        mutate = rng.random(population.shape) < 0.2
+        population[1:] = np.where(mutate, rng.integers(0, CLOUD + 1, population.shape), population)[1:]
+        best_assignment, best_key = None, (float('inf'), float('inf'))
+        first_generation = 0
+    else:
+        rng.bit_generator.state = state['rng']
+        population = np.array(state['population'], dtype=int)
+        best_assignment = None if state['best_assignment'] is None else np.array(state['best_assignment'], dtype=int)
+        best_key = tuple(state['best_key'])
+        first_generation = state['generation']
+
+    for generation in range(first_generation, generations):
+        if checkpoint is not None and generation % checkpoint_every == 0:
+            write_checkpoint(checkpoint, {
+                'kind': 'genetic_optimization', 'key': key, 'generation': generation,
+                'population': population.tolist(), 'rng': rng.bit_generator.state,
+                'best_assignment': None if best_assignment is None else best_assignment.tolist(),
+                'best_key': [float(value) for value in best_key],
+            })
+        makespan, energy = evaluate_population(population, tables)
+        fitness = energy + penalty * np.maximum(makespan - T_max, 0)
+
+        feasible = np.flatnonzero(makespan <= T_max)
+        if len(feasible):
+            i = feasible[np.lexsort((makespan[feasible], energy[feasible]))[0]]
+            if (energy[i], makespan[i]) < best_key:
+                best_assignment, best_key = population[i].copy(), (energy[i], makespan[i])
+
+        # 精英保留 + 锦标赛选择 + 均匀交叉 + 随机变异
+        ranked = np.argsort(fitness, kind='stable')
+        challengers = rng.integers(0, population_size, (2, population_size - elite, 2))
+        winners = np.where(fitness[challengers[..., 0]] <= fitness[challengers[..., 1]],
+                           challengers[..., 0], challengers[..., 1])
+        crossover = rng.random((population_size - elite, n)) < 0.5
+        children = np.where(crossover, population[winners[0]], population[winners[1]])
+        mutate = rng.random(children.shape) < mutation_rate
+        children = np.where(mutate, rng.integers(0, CLOUD + 1, children.shape), children)
+        population = np.vstack([population[ranked[:elite]], children])
+
+    remove_checkpoint(checkpoint)
+    if best_assignment is None:
+        return scheduled_tasks
+    return decode_assignment(best_assignment, G, execution_times, T_send, T_cloud, T_receive, tables)
+
+
+def main():
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    for example, T_max in ((2, 27), (3, 38), (4, 36), (5, 39)):
+        module = importlib.import_module(f'Example{example}_Final')
+        G, execution_times = module.create_task_graph()
+        initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+
+        for name, optimizer in (('Single pass', migrate_tasks), ('Converged', migrate_until_converged),
+                                ('Genetic', genetic_optimization)):
+            start = time.perf_counter()
+            schedule = optimizer(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+            elapsed = time.perf_counter() - start
+            critical_time = max(details['finish_time'] for details in schedule.values())
+            total_energy = compute_energy(schedule, execution_times, T_send, T_receive)[2]
+            print(f"Example {example} {name}: T_total = {critical_time}, Energy = {total_energy}, "
+                  f"Time = {elapsed:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+import heapq
+import os
+import time
+from bisect import bisect_left
+
+import networkx as nx
+
+from checkpoint import (assignment_from_state, assignment_to_state, read_checkpoint, remove_checkpoint, run_key,
+                        write_checkpoint)
+from Example5_Final import compute_energy, task_time
+from telemetry import inc, observe
+from validator import assert_valid_schedule
+
+# 与 compute_energy 中的常量保持一致
+CORE_POWERS = {1: 1, 2: 2, 3: 4}
+RF_POWER = 0.5
+NUM_CORES = 3
+
+# 剪枝只在超出量大于舍入误差时生效（DVFS 等非整数时间下，正向累加与 T_max - tail 的舍入不同）
+SLACK_TOLERANCE = 1e-9
+
+# 调试模式：SCHEDULE_DEBUG=1 时每个重新计时的候选方案都经过 validator 检查
+DEBUG_VALIDATE = os.environ.get('SCHEDULE_DEBUG') == '1'
+
+
+def copy_schedule(scheduled_tasks):
+    # 逐任务复制，避免候选方案之间共享同一个 dict（scheduled_tasks.copy() 只是浅拷贝）
+    return {task: dict(details) for task, details in scheduled_tasks.items()}
+
+
+def migration_targets(num_cores=NUM_CORES):
+    return [('core', core) for core in range(1, num_cores + 1)] + [('cloud', None)]
+
+
+def place_task(location, core=None):
+    if location == 'core':
+        return {'location': 'core', 'core': core}
+    return {'location': 'cloud'}
+
+
+def task_energy(task, details, execution_times, T_send, T_receive, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    if details['location'] == 'core':
+        core = details['core']
+        return core_powers[core] * execution_times[task][core - 1]
+    return rf_power * task_time(T_send, task) + rf_power * task_time(T_receive, task)
+
+
+def ranked_targets(execution_times, T_send, T_receive, tasks, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    # 迁移目标的能耗只取决于执行时间表和功率常量，可一次性预先排序（能耗低者在前）
+    ranked = {}
+    for task in tasks:
+        targets = [
+            (task_energy(task, place_task(location, core), execution_times, T_send, T_receive, core_powers, rf_power),
+             location, core)
+            for location, core in migration_targets()
+        ]
+        ranked[task] = sorted(targets, key=lambda target: target[0])
+    return ranked
+
+
+def compute_ready_time(G, scheduled_tasks, task):
+    ready_time = 0
+    for pred in G.predecessors(task):
+        if scheduled_tasks[pred]['location'] == 'core':
+            ready_time = max(ready_time, scheduled_tasks[pred]['finish_time'])
+        else:
+            ready_time = max(ready_time, scheduled_tasks[pred]['start_time_cloud'])
+    return ready_time
+
+
+def sequence_order(G, scheduled_tasks, order=None):
+    """
+    Topological order that follows the schedule's start times, so that re-timing
+    keeps the existing task sequence on every core and on the wireless channel (a
+    plain topological order can reshuffle them and stretch the makespan). Ties, and
+    tasks without a start time, fall back to their position in `order`.
+    """
+    order = list(nx.topological_sort(G)) if order is None else order
+    position = {task: i for i, task in enumerate(order)}
+    waiting = {task: G.in_degree(task) for task in order}
+    heap = [(scheduled_tasks[task].get('start_time', 0), position[task], task) for task in order if not waiting[task]]
+    heapq.heapify(heap)
+
+    sequence = []
+    while heap:
+        _, _, task = heapq.heappop(heap)
+        sequence.append(task)
+        for succ in G.successors(task):
+            waiting[succ] -= 1
+            if not waiting[succ]:
+                heapq.heappush(heap, (scheduled_tasks[succ].get('start_time', 0), position[succ], succ))
+    return sequence
+
+
+def retime_schedule(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, order=None):
+    """
+    Same timing rules as recalculate_schedule_times, but also refreshes the cloud
+    timestamps and returns the makespan. Pass a precomputed topological order to
+    avoid re-sorting G for every candidate.
+    """
+    start = time.perf_counter()
+    cores = [0] * NUM_CORES
+    wireless_sending = 0
+    max_time = 0
+
+    for node in (order if order is not None else nx.topological_sort(G)):
+        details = scheduled_tasks[node]
+        ready_time = compute_ready_time(G, scheduled_tasks, node)
+
+        if details['location'] == 'core':
+            core = details['core'] - 1
+            start_time = max(ready_time, cores[core])
+            finish_time = start_time + execution_times[node][core]
+            cores[core] = finish_time
+        else:
+            start_time = max(wireless_sending, ready_time)
+            details['start_time_cloud'] = start_time + task_time(T_send, node)
+            details['finish_time_cloud'] = details['start_time_cloud'] + task_time(T_cloud, node)
+            finish_time = details['finish_time_cloud'] + task_time(T_receive, node)
+            wireless_sending = details['start_time_cloud']
+
+        details['ready_time'] = ready_time
+        details['start_time'] = start_time
+        details['finish_time'] = finish_time
+        max_time = max(max_time, finish_time)
+
+    if DEBUG_VALIDATE:
+        assert_valid_schedule(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive)
+    inc('schedule_retime_total')
+    observe('schedule_retime_seconds', time.perf_counter() - start)
+    return max_time
+
+
+def build_slack_index(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max, order):
+    """
+    Latest start times for a retimed schedule. Each core and the wireless channel is
+    a chain ordered by topological position, and tail[x] is the longest path from the
+    start of x to the end of the schedule over dependency and chain edges, so
+    T_max - tail[x] is the latest start of x. The chains are kept as sorted position
+    lists so a moved task's new start and its new chain successor come from bisection.
+    """
+    position = {task: i for i, task in enumerate(order)}
+    chains = {core: ([], [], []) for core in range(1, NUM_CORES + 1)}
+    chains['cloud'] = ([], [], [])
+
+    for i, task in enumerate(order):
+        details = scheduled_tasks[task]
+        if details['location'] == 'core':
+            positions, tasks, free_times = chains[details['core']]
+            free_times.append(details['finish_time'])
+        else:
+            positions, tasks, free_times = chains['cloud']
+            free_times.append(details['start_time'] + task_time(T_send, task))
+        positions.append(i)
+        tasks.append(task)
+
+    chain_next = {}
+    for positions, tasks, free_times in chains.values():
+        for prev, nxt in zip(tasks, tasks[1:]):
+            chain_next[prev] = nxt
+
+    # 核心任务对后继/同链下一任务的约束都是执行时间；云端任务都是发送时间
+    tail = {}
+    latest_release = {}
+    for task in reversed(order):
+        details = scheduled_tasks[task]
+        if details['location'] == 'core':
+            duration = offset = execution_times[task][details['core'] - 1]
+        else:
+            offset = task_time(T_send, task)
+            duration = offset + task_time(T_cloud, task) + task_time(T_receive, task)
+        succ_tail = max((tail[succ] for succ in G.successors(task)), default=0)
+        latest_release[task] = T_max - succ_tail
+        if task in chain_next:
+            succ_tail = max(succ_tail, tail[chain_next[task]])
+        tail[task] = max(duration, offset + succ_tail)
+
+    latest_start = {task: T_max - tail[task] for task in order}
+    return {'position': position, 'chains': chains, 'latest_start': latest_start,
+            'latest_release': latest_release}
+
+
+def exceeds_slack(slack_index, scheduled_tasks, task, location, core, execution_times, T_send, T_cloud,
+                  T_receive, T_max):
+    # 拓扑序中排在任务之前的部分不受迁移影响，因此新的开始时间是精确的；
+    # 之后的部分只会被推迟，用 latest_start 判断即可
+    positions, tasks, free_times = slack_index['chains'][core if location == 'core' else 'cloud']
+    i = bisect_left(positions, slack_index['position'][task])
+    start_time = max(scheduled_tasks[task]['ready_time'], free_times[i - 1] if i else 0)
+    # 留在原资源上（如 DVFS 只改频率档位）时任务本身还在链中，链上的后继是下一个任务
+    successor = i + 1 if i < len(tasks) and tasks[i] == task else i
+
+    if location == 'core':
+        release_time = finish_time = start_time + execution_times[task][core - 1]
+    else:
+        release_time = start_time + task_time(T_send, task)
+        finish_time = release_time + task_time(T_cloud, task) + task_time(T_receive, task)
+
+    if finish_time > T_max + SLACK_TOLERANCE or release_time > slack_index['latest_release'][task] + SLACK_TOLERANCE:
+        return True
+    return (successor < len(tasks)
+            and release_time > slack_index['latest_start'][tasks[successor]] + SLACK_TOLERANCE)
+
+
+def record_migration_metrics(optimizer, counts, moves, elapsed):
+    # 扫描过程中只累加局部计数，结束时一次性写入 telemetry，热循环里没有额外开销
+    for outcome, count in counts.items():
+        inc('schedule_migration_candidates_total', count, optimizer=optimizer, outcome=outcome)
+    inc('schedule_migration_moves_total', moves, optimizer=optimizer)
+    observe('schedule_migration_sweep_seconds', elapsed, optimizer=optimizer)
+
+
+def migrate_tasks(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max, tasks=None,
+                  order=None, checkpoint=None, checkpoint_every=100, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    """
+    Quiet variant of task_migration_optimized: one sweep over `tasks` (all tasks by
+    default), trying every core and the cloud for each and keeping the lowest-energy
+    move that still meets T_max (ties broken by makespan). Targets are visited in
+    increasing energy order and the scan stops at the first one that cannot beat the
+    best move so far; candidates that the slack index proves infeasible are rejected
+    without re-timing.
+
+    With a `checkpoint` path, the assignment, sweep position and best energy are saved
+    every `checkpoint_every` tasks, and an existing checkpoint is resumed from, giving
+    the same result as an uninterrupted run; one written for a different graph, T_max
+    or other inputs raises ValueError. The file is removed once the sweep ends.
+    A precomputed topological `order` (e.g. from graph_cache) skips sorting G, and
+    core_powers / rf_power replace the default power constants.
+
+    Re-timing follows the input's per-resource task sequence (sequence_order), so a
+    feasible input is never returned later than it came in.
+    """
+    start = time.perf_counter()
+    counts = {'pruned_energy': 0, 'pruned_slack': 0, 'rejected_deadline': 0, 'feasible': 0}
+    moves = 0
+    order = sequence_order(G, scheduled_tasks, order)
+    tasks = list(scheduled_tasks) if tasks is None else tasks
+    key = None
+    if checkpoint is not None:
+        # 输入调度决定起点和重新计时的顺序，也要计入 key
+        start_assignment = [(task, scheduled_tasks[task]['location'], scheduled_tasks[task].get('core'))
+                            for task in order]
+        key = run_key(G, execution_times, T_max, T_send, T_cloud, T_receive, tasks, core_powers, rf_power,
+                      start_assignment)
+    state = read_checkpoint(checkpoint, 'migrate_tasks', key)
+    final_schedule = copy_schedule(scheduled_tasks) if state is None else assignment_from_state(state['assignment'])
+    best_time = retime_schedule(G, final_schedule, execution_times, T_send, T_cloud, T_receive, order)
+    slack_index = build_slack_index(G, final_schedule, execution_times, T_send, T_cloud, T_receive, T_max, order)
+    best_energy = compute_energy(final_schedule, execution_times, T_send, T_receive, core_powers, rf_power)[2]
+    if state is not None:
+        best_energy = state['best_energy']
+    ranked = ranked_targets(execution_times, T_send, T_receive, tasks, core_powers, rf_power)
+
+    for position in range(0 if state is None else state['position'], len(tasks)):
+        if checkpoint is not None and position % checkpoint_every == 0:
+            write_checkpoint(checkpoint, {'kind': 'migrate_tasks', 'key': key, 'position': position,
+                                          'best_energy': best_energy,
+                                          'assignment': assignment_to_state(final_schedule)})
+        task = tasks[position]
+        current = final_schedule[task]
+        base_energy = best_energy - task_energy(task, current, execution_times, T_send, T_receive,
+                                                core_powers, rf_power)
+        best_schedule = final_schedule
+
+        for i, (target_energy, location, core) in enumerate(ranked[task]):
+            energy = base_energy + target_energy
+            if energy > best_energy:
+                counts['pruned_energy'] += len(ranked[task]) - i
+                break
+            if current['location'] == location and current.get('core') == core:
+                continue
+            if exceeds_slack(slack_index, final_schedule, task, location, core, execution_times,
+                             T_send, T_cloud, T_receive, T_max):
+                counts['pruned_slack'] += 1
+                continue
+            candidate = copy_schedule(final_schedule)
+            candidate[task] = place_task(location, core)
+            critical_time = retime_schedule(G, candidate, execution_times, T_send, T_cloud, T_receive, order)
+            if critical_time > T_max:
+                counts['rejected_deadline'] += 1
+                continue
+
+            counts['feasible'] += 1
+            if energy < best_energy or (energy == best_energy and critical_time < best_time):
+                best_schedule, best_energy, best_time = candidate, energy, critical_time
+
+        if best_schedule is not final_schedule:
+            final_schedule = best_schedule
+            moves += 1
+            slack_index = build_slack_index(G, final_schedule, execution_times, T_send, T_cloud, T_receive,
+                                            T_max, order)
+
+    remove_checkpoint(checkpoint)
+    record_migration_metrics('migrate_tasks', counts, moves, time.perf_counter() - start)
+    return final_schedule
+
+
+def migrate_until_converged(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max, tasks=None,
+                            max_moves=None, order=None, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    """
+    Multi-pass migration: repeatedly commit the single move with the largest energy
+    reduction that still meets T_max (ties broken by makespan) until no such move is
+    left. Gains only change for the task that moved, so they sit in a lazy heap and
+    each round only re-checks the moves ranked above the one it commits. core_powers /
+    rf_power replace the default power constants, as in migrate_tasks.
+    """
+    start = time.perf_counter()
+    counts = {'pruned_slack': 0, 'rejected_deadline': 0, 'feasible': 0}
+    order = sequence_order(G, scheduled_tasks, order)
+    position = {task: i for i, task in enumerate(order)}
+    final_schedule = copy_schedule(scheduled_tasks)
+    retime_schedule(G, final_schedule, execution_times, T_send, T_cloud, T_receive, order)
+    slack_index = build_slack_index(G, final_schedule, execution_times, T_send, T_cloud, T_receive, T_max, order)
+    tasks = list(final_schedule) if tasks is None else tasks
+    ranked = ranked_targets(execution_times, T_send, T_receive, tasks, core_powers, rf_power)
+    version = {task: 0 for task in tasks}
+    move_heap = []
+
+    def push_moves(task):
+        current_energy = task_energy(task, final_schedule[task], execution_times, T_send, T_receive,
+                                     core_powers, rf_power)
+        for i, (target_energy, location, core) in enumerate(ranked[task]):
+            if target_energy < current_energy:
+                heapq.heappush(move_heap, (target_energy - current_energy, position[task], i, version[task], task))
+
+    for task in tasks:
+        push_moves(task)
+
+    moves = 0
+    while move_heap and (max_moves is None or moves < max_moves):
+        deferred = []
+        best = None  # (entry, critical_time, candidate)
+        while move_heap:
+            entry = move_heap[0]
+            if best is not None and entry[0] > best[0][0]:
+                break
+            heapq.heappop(move_heap)
+            _, _, i, entry_version, task = entry
+            if entry_version != version[task]:
+                continue
+
+            _, location, core = ranked[task][i]
+            if exceeds_slack(slack_index, final_schedule, task, location, core, execution_times,
+                             T_send, T_cloud, T_receive, T_max):
+                counts['pruned_slack'] += 1
+                deferred.append(entry)
+                continue
+            candidate = copy_schedule(final_schedule)
+            candidate[task] = place_task(location, core)
+            critical_time = retime_schedule(G, candidate, execution_times, T_send, T_cloud, T_receive, order)
+            counts['rejected_deadline' if critical_time > T_max else 'feasible'] += 1
+            if critical_time > T_max:
+                deferred.append(entry)
+            elif best is None or critical_time < best[1]:
+                if best is not None:
+                    deferred.append(best[0])
+                best = (entry, critical_time, candidate)
+            else:
+                deferred.append(entry)
+
+        if best is None:
+            break
+
+        task = best[0][4]
+        final_schedule = best[2]
+        version[task] += 1
+        slack_index = build_slack_index(G, final_schedule, execution_times, T_send, T_cloud, T_receive, T_max, order)
+        push_moves(task)
+        # 被跳过的迁移在新的调度下可能变得可行，放回堆中等待下一轮
+        for entry in deferred:
+            if entry[3] == version[entry[4]]:
+                heapq.heappush(move_heap, entry)
+        moves += 1
+
+    record_migration_metrics('migrate_until_converged', counts, moves, time.perf_counter() - start)
+    return final_schedule
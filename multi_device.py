@@ -0,0 +1,232 @@
+import heapq
+import importlib
+import time
+
+from channels import min_task_time, new_timeline, schedule_cloud_task, timeline_reserve
+from Example5_Final import compute_energy, compute_priority_values, initial_scheduling, task_time
+from migration import (NUM_CORES, compute_ready_time, copy_schedule, migrate_tasks, place_task,
+                       ranked_targets, sequence_order, task_energy)
+
+
+def new_shared_resources(T_send, T_cloud, T_receive, num_channels=1, cloud_capacity=1):
+    # 所有设备共享的无线收发通道和有限的云端执行单元
+    return {
+        'sending': [new_timeline(min_task_time(T_send)) for _ in range(num_channels)],
+        'computing': [new_timeline(min_task_time(T_cloud)) for _ in range(cloud_capacity)],
+        'receiving': [new_timeline(min_task_time(T_receive)) for _ in range(num_channels)],
+    }
+
+
+def copy_resources(resources):
+    return {
+        kind: [{'starts': list(t['starts']), 'ends': list(t['ends']), 'min_gap': t['min_gap']} for t in timelines]
+        for kind, timelines in resources.items()
+    }
+
+
+def shared_background(schedules, T_send, T_cloud, T_receive, num_channels=1, cloud_capacity=1, skip=None):
+    # 把除 skip 以外所有设备的云端任务占用写入共享资源时间轴
+    resources = new_shared_resources(T_send, T_cloud, T_receive, num_channels, cloud_capacity)
+    reservations = []
+    for device, schedule in enumerate(schedules):
+        if device == skip:
+            continue
+        for task, details in schedule.items():
+            if details['location'] == 'cloud':
+                reservations.append(('sending', details['send_channel'], details['start_time'],
+                                     task_time(T_send, task)))
+                reservations.append(('computing', details['cloud_unit'], details['start_time_cloud'],
+                                     task_time(T_cloud, task)))
+                reservations.append(('receiving', details['receive_channel'], details['start_time_receive'],
+                                     task_time(T_receive, task)))
+    for kind, unit, start, duration in sorted(reservations, key=lambda r: r[2]):
+        timeline_reserve(resources[kind][unit - 1], start, duration)
+    return resources
+
+
+def joint_initial_scheduling(devices, T_send, T_cloud, T_receive, num_channels=1, cloud_capacity=1):
+    """
+    Event-driven initial_scheduling for several devices at once. devices is a list of
+    (G, execution_times); each device has its own three cores, while the wireless
+    channels and cloud units are shared. Tasks of all devices are taken from one heap
+    in order of ready time (then priority), so contention is resolved as it happens.
+    Returns one schedule dict per device.
+    """
+    resources = new_shared_resources(T_send, T_cloud, T_receive, num_channels, cloud_capacity)
+    schedules = [{} for _ in devices]
+    cores = [[0] * NUM_CORES for _ in devices]
+    priorities = [compute_priority_values(G, execution_times) for G, execution_times in devices]
+    rank = [{task: i for i, task in enumerate(p)} for p in priorities]
+    remaining_preds = [{task: G.in_degree(task) for task in G.nodes()} for G, _ in devices]
+
+    event_heap = [
+        (0, -priorities[device][task], device, rank[device][task], task)
+        for device, (G, _) in enumerate(devices)
+        for task in G.nodes() if remaining_preds[device][task] == 0
+    ]
+    heapq.heapify(event_heap)
+
+    while event_heap:
+        ready_time, _, device, _, task = heapq.heappop(event_heap)
+        G, execution_times = devices[device]
+        scheduled_tasks = schedules[device]
+
+        core_times = [max(cores[device][i], ready_time) + execution_times[task][i] for i in range(NUM_CORES)]
+        best_core = core_times.index(min(core_times))
+        cloud = schedule_cloud_task(task, {'ready_time': ready_time, 'location': 'cloud'}, ready_time,
+                                    resources['sending'], resources['receiving'], T_send, T_cloud, T_receive,
+                                    reserve=False, computing=resources['computing'])
+
+        if cloud['finish_time'] < core_times[best_core]:
+            scheduled_tasks[task] = schedule_cloud_task(task, cloud, ready_time, resources['sending'],
+                                                        resources['receiving'], T_send, T_cloud, T_receive,
+                                                        computing=resources['computing'])
+        else:
+            scheduled_tasks[task] = {
+                'ready_time': ready_time,
+                'start_time': core_times[best_core] - execution_times[task][best_core],
+                'finish_time': core_times[best_core],
+                'location': 'core',
+                'core': best_core + 1
+            }
+            cores[device][best_core] = core_times[best_core]
+
+        for succ in G.successors(task):
+            remaining_preds[device][succ] -= 1
+            if remaining_preds[device][succ] == 0:
+                succ_ready = compute_ready_time(G, scheduled_tasks, succ)
+                heapq.heappush(event_heap, (succ_ready, -priorities[device][succ], device, rank[device][succ], succ))
+
+    return schedules
+
+
+def retime_device(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, background, order):
+    # 在其他设备的占用之上，为单个设备重新计时；返回该设备的 makespan
+    resources = copy_resources(background)
+    cores = [0] * NUM_CORES
+    max_time = 0
+
+    for node in order:
+        details = scheduled_tasks[node]
+        ready_time = compute_ready_time(G, scheduled_tasks, node)
+        details['ready_time'] = ready_time
+
+        if details['location'] == 'core':
+            core = details['core'] - 1
+            details['start_time'] = max(ready_time, cores[core])
+            details['finish_time'] = details['start_time'] + execution_times[node][core]
+            cores[core] = details['finish_time']
+        else:
+            schedule_cloud_task(node, details, ready_time, resources['sending'], resources['receiving'],
+                                T_send, T_cloud, T_receive, computing=resources['computing'])
+        max_time = max(max_time, details['finish_time'])
+
+    return max_time
+
+
+def joint_task_migration(devices, schedules, T_send, T_cloud, T_receive, T_max, num_channels=1,
+                         cloud_capacity=1):
+    """
+    Migration phase for joint schedules, one device at a time: the other devices'
+    transfers and cloud slots stay fixed as background reservations, so each
+    candidate only re-times its own device and the others remain valid. T_max is
+    either one deadline for all devices or a list with one per device.
+
+    Each device is re-timed in its previous sequence_order, so its tasks keep their
+    order on the cores and channels. If re-timing around the reservations that
+    earlier devices just took still pushes it past its deadline, the device keeps its
+    previous timed schedule, whose slots the earlier devices were placed around and
+    are therefore still free.
+    """
+    deadlines = T_max if isinstance(T_max, (list, tuple)) else [T_max] * len(devices)
+    schedules = [copy_schedule(schedule) for schedule in schedules]
+
+    for device, (G, execution_times) in enumerate(devices):
+        background = shared_background(schedules, T_send, T_cloud, T_receive, num_channels, cloud_capacity,
+                                       skip=device)
+        previous = schedules[device]
+        order = sequence_order(G, previous)
+        final_schedule = copy_schedule(previous)
+        best_time = retime_device(G, final_schedule, execution_times, T_send, T_cloud, T_receive, background, order)
+        best_energy = compute_energy(final_schedule, execution_times, T_send, T_receive)[2]
+        ranked = ranked_targets(execution_times, T_send, T_receive, order)
+
+        for task in order:
+            current = final_schedule[task]
+            base_energy = best_energy - task_energy(task, current, execution_times, T_send, T_receive)
+            best_schedule = final_schedule
+
+            for target_energy, location, core in ranked[task]:
+                energy = base_energy + target_energy
+                if energy > best_energy:
+                    break
+                if current['location'] == location and current.get('core') == core:
+                    continue
+                candidate = copy_schedule(final_schedule)
+                candidate[task] = place_task(location, core)
+                critical_time = retime_device(G, candidate, execution_times, T_send, T_cloud, T_receive,
+                                              background, order)
+                if critical_time > deadlines[device]:
+                    continue
+                if energy < best_energy or (energy == best_energy and critical_time < best_time):
+                    best_schedule, best_energy, best_time = candidate, energy, critical_time
+
+            final_schedule = best_schedule
+
+        # 只有满足截止时间的候选才会被接受，所以超时说明没有任何迁移，保留原调度
+        schedules[device] = previous if best_time > deadlines[device] else final_schedule
+
+    return schedules
+
+
+def count_wireless_conflicts(schedules, T_send, num_channels=1):
+    # 统计发送时已有 num_channels 个传输占用无线介质的次数（独立调度时忽略了共享介质）
+    intervals = sorted(
+        (details['start_time'], details['start_time'] + task_time(T_send, task))
+        for schedule in schedules for task, details in schedule.items() if details['location'] == 'cloud'
+    )
+    conflicts = 0
+    active = []
+    for start, end in intervals:
+        while active and active[0] <= start:
+            heapq.heappop(active)
+        if len(active) >= num_channels:
+            conflicts += 1
+        heapq.heappush(active, end)
+    return conflicts
+
+
+def main():
+    T_send, T_cloud, T_receive = 3, 1, 1
+    examples = [(2, 27), (3, 38), (4, 36), (5, 39)]
+    num_devices, num_channels, cloud_capacity = 20, 4, 2
+
+    devices, deadlines = [], []
+    for i in range(num_devices):
+        example, T_max = examples[i % len(examples)]
+        devices.append(importlib.import_module(f'Example{example}_Final').create_task_graph())
+        deadlines.append(T_max * 3)
+
+    start = time.perf_counter()
+    independent = [
+        migrate_tasks(G, initial_scheduling(G, execution_times, T_send, T_cloud, T_receive),
+                      execution_times, T_send, T_cloud, T_receive, T_max)
+        for (G, execution_times), T_max in zip(devices, deadlines)
+    ]
+    print(f"Independent: Energy = {sum(compute_energy(s, d[1], T_send, T_receive)[2] for s, d in zip(independent, devices))}, "
+          f"Wireless conflicts = {count_wireless_conflicts(independent, T_send, num_channels)}, "
+          f"Time = {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    schedules = joint_initial_scheduling(devices, T_send, T_cloud, T_receive, num_channels, cloud_capacity)
+    schedules = joint_task_migration(devices, schedules, T_send, T_cloud, T_receive, deadlines,
+                                     num_channels, cloud_capacity)
+    total_energy = sum(compute_energy(s, d[1], T_send, T_receive)[2] for s, d in zip(schedules, devices))
+    misses = sum(max(d['finish_time'] for d in s.values()) > T_max for s, T_max in zip(schedules, deadlines))
+    assert misses == 0, "joint migration returned a schedule that misses its deadline"
+    print(f"Joint ({num_channels} channels, {cloud_capacity} cloud units): Energy = {total_energy}, "
+          f"Deadline misses = {misses}, Time = {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
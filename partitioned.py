@@ -0,0 +1,149 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+
+from Example5_Final import compute_energy, initial_scheduling
+from graph_cache import compute_levels
+from migration import CORE_POWERS, RF_POWER, copy_schedule, migrate_tasks, place_task, retime_schedule, sequence_order
+
+
+def level_regions(G, order, region_size=2000):
+    """
+    Splits G into bands of consecutive levels with about region_size tasks each. Every
+    edge goes from a lower level to a higher one, so edges between regions only point
+    forward and the regions can be optimized independently.
+    """
+    levels = compute_levels(G, order)
+    by_level = {}
+    for task in order:
+        by_level.setdefault(levels[task], []).append(task)
+
+    regions, current = [], []
+    for level in sorted(by_level):
+        current.extend(by_level[level])
+        if len(current) >= region_size:
+            regions.append(current)
+            current = []
+    if current:
+        regions.append(current)
+    return regions
+
+
+def restrict_times(value, tasks):
+    # 按任务给出的时间表只把本区域的部分传给子进程
+    return {task: value[task] for task in tasks} if isinstance(value, dict) else value
+
+
+def optimize_region(args):
+    # 子进程入口：在区域子图上做一轮迁移，只返回每个任务的位置
+    sub_G, assignment, execution_times, T_send, T_cloud, T_receive, core_powers, rf_power, budget = args
+    # assignment 按区域内的资源顺序排列，没有开始时间的调度会沿用这个顺序重新计时
+    schedule = {task: place_task(location, core) for task, (location, core) in assignment.items()}
+    schedule = migrate_tasks(sub_G, schedule, execution_times, T_send, T_cloud, T_receive, budget,
+                             order=list(assignment), core_powers=core_powers, rf_power=rf_power)
+    return {task: (details['location'], details.get('core')) for task, details in schedule.items()}
+
+
+def partitioned_migration(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max,
+                          region_size=2000, workers=None, core_powers=CORE_POWERS, rf_power=RF_POWER):
+    """
+    Migration for graphs too large for one global sweep. G is cut into level bands
+    (level_regions); each band gets a share of T_max proportional to its own makespan
+    under the current assignment and is optimized with migrate_tasks in a worker
+    process. Run back to back, the bands would finish within the sum of their budgets,
+    and the stitched schedule, retimed in band order without barriers, can only be
+    faster. A final migrate_tasks pass over the tasks with edges between bands uses the
+    slack recovered at the boundaries. Bands and the fallback are re-timed in the
+    input's per-resource sequence (sequence_order); if the result misses T_max while
+    the input met it, the input is returned retimed. core_powers / rf_power are passed to
+    every migrate_tasks call.
+    """
+    order = list(nx.topological_sort(G))
+    regions = level_regions(G, order, region_size)
+    region_of = {task: i for i, region in enumerate(regions) for task in region}
+
+    jobs, makespans = [], []
+    for region in regions:
+        sub_G = G.subgraph(region).copy()
+        sub_order = sequence_order(sub_G, scheduled_tasks)
+        sub_times = {task: execution_times[task] for task in region}
+        sub_T = [restrict_times(value, region) for value in (T_send, T_cloud, T_receive)]
+        assignment = {task: (scheduled_tasks[task]['location'], scheduled_tasks[task].get('core'))
+                      for task in sub_order}
+        schedule = {task: place_task(location, core) for task, (location, core) in assignment.items()}
+        makespans.append(retime_schedule(sub_G, schedule, sub_times, *sub_T, sub_order))
+        jobs.append([sub_G, assignment, sub_times, *sub_T, core_powers, rf_power])
+
+    # 截止时间按各区域当前的 makespan 比例分配，总和不超过 T_max
+    total = sum(makespans)
+    for job, makespan in zip(jobs, makespans):
+        job.append(makespan * T_max / total if total else T_max)
+
+    if workers == 1 or len(jobs) == 1:
+        results = [optimize_region(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(optimize_region, jobs))
+
+    band_order = [task for job in jobs for task in job[1]]
+    assignment = {task: location for result in results for task, location in result.items()}
+    stitched = {task: place_task(*assignment[task]) for task in scheduled_tasks}
+    retime_schedule(G, stitched, execution_times, T_send, T_cloud, T_receive, band_order)
+
+    boundary = [task for task in band_order
+                if any(region_of[succ] != region_of[task] for succ in G.successors(task))
+                or any(region_of[pred] != region_of[task] for pred in G.predecessors(task))]
+    final_schedule = migrate_tasks(G, stitched, execution_times, T_send, T_cloud, T_receive, T_max,
+                                   tasks=boundary, order=band_order, core_powers=core_powers, rf_power=rf_power)
+
+    if max(details['finish_time'] for details in final_schedule.values()) > T_max:
+        fallback = copy_schedule(scheduled_tasks)
+        if retime_schedule(G, fallback, execution_times, T_send, T_cloud, T_receive,
+                           sequence_order(G, scheduled_tasks, order)) <= T_max:
+            return fallback
+    return final_schedule
+
+
+def random_layered_graph(num_tasks, num_levels, edges_per_task=2, seed=0):
+    # 分层随机 DAG：每个任务从前几层随机选前驱，用于大规模测试
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    execution_times = {}
+    levels = [list(range(level * num_tasks // num_levels, (level + 1) * num_tasks // num_levels))
+              for level in range(num_levels)]
+    for level, tasks in enumerate(levels):
+        for task in tasks:
+            G.add_node(task)
+            fastest = rng.randint(1, 4)
+            execution_times[task] = [fastest + rng.randint(2, 5), fastest + rng.randint(1, 3), fastest]
+            if level:
+                candidates = [t for prev in levels[max(0, level - 3):level] for t in prev]
+                for pred in rng.sample(candidates, min(edges_per_task, len(candidates))):
+                    G.add_edge(pred, task)
+    return G, execution_times
+
+
+def main():
+    T_send, T_cloud, T_receive = 3, 1, 1
+    G, execution_times = random_layered_graph(4000, 200)
+    initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+    T_max = max(details['finish_time'] for details in initial_schedule.values()) * 1.2
+
+    for name, optimize in (
+            ('Global', lambda: migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)),
+            ('Partitioned', lambda: partitioned_migration(G, initial_schedule, execution_times, T_send, T_cloud,
+                                                          T_receive, T_max, region_size=500,
+                                                          workers=os.cpu_count()))):
+        start = time.perf_counter()
+        schedule = optimize()
+        elapsed = time.perf_counter() - start
+        print(f"{name}: T_total = {max(d['finish_time'] for d in schedule.values())}, "
+              f"Energy = {compute_energy(schedule, execution_times, T_send, T_receive)[2]}, "
+              f"Time = {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
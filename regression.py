@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from experiments import graph_name, load_graph, write_energy_report, write_scheduling_table
+from migration import migrate_tasks, migrate_until_converged
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(ROOT, 'golden')
+BASELINE_FILE = os.path.join(GOLDEN_DIR, 'baseline.json')
+
+# 示例脚本及其输出文件夹；每个脚本运行后生成 scheduling.txt 和 energy_report.txt
+SCENARIOS = [
+    ('example1.py', 'example1'),
+    ('example1_result.py', 'Example1_Final'),
+    ('example2.py', 'example2'),
+    ('example3.py', 'example3'),
+    ('example4.py', 'example4'),
+    ('example5.py', 'example5'),
+    ('Example2_Final.py', 'Example2_Final'),
+    ('Example3_Final.py', 'Example3_Final'),
+    ('Example4_Final.py', 'Example4_Final'),
+    ('Example5_Final.py', 'Example5_Final'),
+]
+OUTPUT_FILES = ('scheduling.txt', 'energy_report.txt')
+
+# migration.py 中优化器的场景：(图来源, T_max)，图来源的写法与 experiments.py 相同；
+# 在进程内运行，输出到 golden/<图>_<优化器>
+RANDOM_GRAPH = {'num_tasks': 200, 'num_levels': 15, 'seed': 0}
+OPTIMIZER_GRAPHS = [('Example2_Final', 27), ('Example3_Final', 38), ('Example4_Final', 36), ('Example5_Final', 39),
+                    (RANDOM_GRAPH, 190)]
+OPTIMIZERS = ('migrate_tasks', 'migrate_until_converged')
+
+# 性能基线只针对优化阶段：(图来源, 优化器, T_max)。task_migration_optimized 使用各脚本 main 中的参数
+# （T_max 取其默认值），基线中以模块名为键；其余以 <图>_<优化器> 为键
+BENCHMARKS = ([(module, 'task_migration_optimized', None)
+               for module in ('Example2_Final', 'Example3_Final', 'Example4_Final', 'Example5_Final')]
+              + [(source, optimizer, T_max) for source, T_max in OPTIMIZER_GRAPHS for optimizer in OPTIMIZERS])
+
+
+def run_scenario(script, folder, workdir):
+    # 脚本把结果写到当前目录下的 folder，在临时目录中运行以免覆盖工作区文件
+    env = dict(os.environ, MPLBACKEND='Agg')
+    subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    outputs = {}
+    for name in OUTPUT_FILES:
+        with open(os.path.join(workdir, folder, name)) as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def optimize(source, optimizer, T_max):
+    T_send, T_cloud, T_receive = 3, 1, 1
+    module, G, execution_times = load_graph(source)
+    initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+    if optimizer == 'task_migration_optimized':
+        # 丢弃打印输出而不缓存，以免计入 measure 的峰值内存
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            schedule = module.task_migration_optimized(G, initial_schedule, execution_times, T_send, T_cloud,
+                                                       T_receive)
+    else:
+        migrate = migrate_tasks if optimizer == 'migrate_tasks' else migrate_until_converged
+        schedule = migrate(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+    return schedule, module.compute_energy(schedule, execution_times, T_send, T_receive)
+
+
+def run_optimizer_scenario(source, optimizer, T_max, workdir):
+    # 输出格式与 Example*_Final.py 的 scheduling.txt / energy_report.txt 相同
+    schedule, energy = optimize(source, optimizer, T_max)
+    folder = os.path.join(workdir, f'{graph_name(source)}_{optimizer}')
+    os.makedirs(folder, exist_ok=True)
+    write_scheduling_table(schedule, os.path.join(folder, 'scheduling.txt'))
+    write_energy_report(energy, os.path.join(folder, 'energy_report.txt'))
+    outputs = {}
+    for name in OUTPUT_FILES:
+        with open(os.path.join(folder, name)) as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def parse_outputs(outputs):
+    # scheduling.txt 每行：Task Start Finish Location Core；energy_report.txt 取 Total Energy
+    assignment = {}
+    for line in outputs['scheduling.txt'].splitlines()[2:]:
+        fields = line.split()
+        if len(fields) >= 5 and fields[0].isdigit():
+            assignment[fields[0]] = (fields[3], fields[4], fields[1], fields[2])
+    energy = next((line.split(':')[1].strip() for line in outputs['energy_report.txt'].splitlines()
+                   if line.startswith('Total Energy')), None)
+    makespan = max((float(finish) for _, _, _, finish in assignment.values()), default=0)
+    return assignment, energy, makespan
+
+
+def compare_outputs(folder, golden, outputs):
+    if golden == outputs:
+        return []
+    golden_assignment, golden_energy, golden_makespan = parse_outputs(golden)
+    assignment, energy, makespan = parse_outputs(outputs)
+    errors = []
+    for task in sorted(set(golden_assignment) | set(assignment), key=int):
+        expected, actual = golden_assignment.get(task), assignment.get(task)
+        if expected != actual:
+            errors.append(f"{folder}: Task {task} expected (location, core, start, finish) = {expected}, got {actual}")
+    if golden_energy != energy:
+        errors.append(f"{folder}: Total Energy expected {golden_energy}, got {energy}")
+    if golden_makespan != makespan:
+        errors.append(f"{folder}: T_total expected {golden_makespan}, got {makespan}")
+    return errors or [f"{folder}: output text differs from golden"]
+
+
+def benchmark_name(source, optimizer):
+    return source if optimizer == 'task_migration_optimized' else f'{graph_name(source)}_{optimizer}'
+
+
+def measure(source, optimizer, T_max, repeats=5):
+    """
+    Wall time per run and tracemalloc peak of initial_scheduling followed by the
+    optimizer for one graph. Each of the `repeats` timings loops for at least 0.2 s
+    (timeit.autorange) and the best is kept; the traced run is separate, since tracing
+    slows allocation down.
+    """
+    def run():
+        optimize(source, optimizer, T_max)
+
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    wall_time = min(timer.repeat(repeats, number)) / number
+
+    tracemalloc.start()
+    run()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'wall_time': wall_time, 'peak_memory': peak_memory}
+
+
+def check_performance(baseline, results, time_tolerance, memory_tolerance):
+    errors = []
+    for name, result in results.items():
+        if name not in baseline:
+            errors.append(f"{name}: no performance baseline")
+            continue
+        expected = baseline[name]
+        if result['wall_time'] > expected['wall_time'] * (1 + time_tolerance):
+            errors.append(f"{name}: wall time {result['wall_time']:.4f}s exceeds baseline "
+                          f"{expected['wall_time']:.4f}s by more than {time_tolerance:.0%}")
+        if result['peak_memory'] > expected['peak_memory'] * (1 + memory_tolerance):
+            errors.append(f"{name}: peak memory {result['peak_memory']} B exceeds baseline "
+                          f"{expected['peak_memory']} B by more than {memory_tolerance:.0%}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regression check of the example scenarios against golden outputs "
+                                                 "and performance baselines.")
+    parser.add_argument('--update', action='store_true', help="rewrite the golden outputs and the baseline")
+    parser.add_argument('--update-baseline', action='store_true', help="rewrite only the performance baseline")
+    parser.add_argument('--time-tolerance', type=float, default=0.5)
+    parser.add_argument('--memory-tolerance', type=float, default=0.2)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    errors = []
+    with tempfile.TemporaryDirectory() as workdir:
+        scenarios = [(script, folder, lambda script=script, folder=folder: run_scenario(script, folder, workdir))
+                     for script, folder in SCENARIOS]
+        scenarios += [(f'{graph_name(source)} {optimizer}', f'{graph_name(source)}_{optimizer}',
+                       lambda source=source, optimizer=optimizer, T_max=T_max:
+                       run_optimizer_scenario(source, optimizer, T_max, workdir))
+                      for source, T_max in OPTIMIZER_GRAPHS for optimizer in OPTIMIZERS]
+        for script, folder, run in scenarios:
+            outputs = run()
+            golden_folder = os.path.join(GOLDEN_DIR, folder)
+            if args.update:
+                os.makedirs(golden_folder, exist_ok=True)
+                for name, text in outputs.items():
+                    with open(os.path.join(golden_folder, name), 'w') as f:
+                        f.write(text)
+                continue
+            golden = {}
+            for name in OUTPUT_FILES:
+                with open(os.path.join(golden_folder, name)) as f:
+                    golden[name] = f.read()
+            scenario_errors = compare_outputs(folder, golden, outputs)
+            print(f"{script}: {'ok' if not scenario_errors else 'FAILED'}")
+            errors.extend(scenario_errors)
+
+    results = {}
+    for source, optimizer, T_max in BENCHMARKS:
+        name = benchmark_name(source, optimizer)
+        results[name] = measure(source, optimizer, T_max, args.repeats)
+        print(f"{name}: Time = {results[name]['wall_time']:.4f}s, Peak memory = {results[name]['peak_memory']} B")
+
+    if args.update or args.update_baseline:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {os.path.relpath(BASELINE_FILE, ROOT)}")
+    else:
+        with open(BASELINE_FILE) as f:
+            errors.extend(check_performance(json.load(f), results, args.time_tolerance, args.memory_tolerance))
+
+    for error in errors:
+        print(error)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from Example5_Final import task_time
+
+
+def render_schedule(scheduled_tasks, T_send, T_cloud, T_receive, filename, title="Optimized Task Scheduling"):
+    """
+    Same chart as visualize_scheduling, drawn on a standalone Figure with the Agg
+    canvas: no pyplot state is touched, so it is safe to call from worker processes
+    and threads, and nothing has to be closed afterwards.
+    """
+    colors = colormaps['tab10'](range(len(scheduled_tasks)))
+    task_colors = {task: colors[i % 10] for i, task in enumerate(scheduled_tasks)}
+
+    fig = Figure(figsize=(20, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for task, details in scheduled_tasks.items():
+        color = task_colors[task]
+        if details['location'] == 'core':
+            track = f"Core {details['core']}"
+            start_time = details['start_time']
+            execution_time = details['finish_time'] - start_time
+            ax.barh(track, execution_time, left=start_time, color=color, edgecolor='black', label=f'Task {task}')
+            ax.text(start_time + execution_time / 2, track, str(task), va='center', ha='center', color='white',
+                    fontsize=8)
+        elif details['location'] == 'cloud':
+            start_time = details['start_time']
+            send_time, cloud_time, receive_time = task_time(T_send, task), task_time(T_cloud, task), task_time(T_receive, task)
+            segments = (('Wireless Sending', start_time, send_time),
+                        ('Cloud', start_time + send_time, cloud_time),
+                        ('Wireless Receiving', start_time + send_time + cloud_time, receive_time))
+            for i, (track, left, width) in enumerate(segments):
+                ax.barh(track, width, left=left, color=color, edgecolor='black', label=f'Task {task}' if i == 0 else None)
+                ax.text(left + width / 2, track, str(task), va='center', ha='center', color='white', fontsize=8)
+
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Execution Units")
+    ax.set_title(title)
+    ax.grid(axis='x')
+
+    handles, labels = ax.get_legend_handles_labels()
+    unique_labels = {label: handle for handle, label in zip(handles, labels)}
+    ax.legend(unique_labels.values(), unique_labels.keys(), loc='upper right', fontsize='small')
+
+    fig.savefig(filename)
+    return filename
+
+
+def _render_job(job):
+    return render_schedule(*job)
+
+
+def submit_renders(pool, jobs):
+    # 只提交、不等待：调度流程可以继续运行，需要时再对返回的 future 调用 result()
+    return [pool.submit(_render_job, job) for job in jobs]
+
+
+def render_schedules(jobs, workers=None):
+    """
+    Renders (scheduled_tasks, T_send, T_cloud, T_receive, filename) jobs on a process
+    pool and returns the filenames in job order.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [future.result() for future in submit_renders(pool, jobs)]
+
+
+def main():
+    import importlib
+    import time
+
+    from migration import migrate_tasks
+
+    T_send, T_cloud, T_receive = 3, 1, 1
+    jobs = []
+    for example in (2, 3, 4, 5):
+        module = importlib.import_module(f'Example{example}_Final')
+        G, execution_times = module.create_task_graph()
+        initial_schedule = module.initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+        for T_max in range(30, 46, 3):
+            schedule = migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+            jobs.append((schedule, T_send, T_cloud, T_receive, f'Example{example}_Tmax{T_max}.png'))
+
+    os.makedirs('figures', exist_ok=True)
+    jobs = [(*job[:4], os.path.join('figures', job[4])) for job in jobs]
+    start = time.perf_counter()
+    render_schedules(jobs, workers=os.cpu_count())
+    print(f"Rendered {len(jobs)} figures to 'figures' in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
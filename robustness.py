@@ -0,0 +1,89 @@
+import networkx as nx
+import numpy as np
+
+from Example5_Final import create_task_graph, initial_scheduling, task_time
+from migration import CORE_POWERS, NUM_CORES, RF_POWER, migrate_tasks
+
+
+def fixed_order(G, scheduled_tasks):
+    # 按开始时间处理任务：同一核心/无线通道上的先后顺序和依赖顺序都与调度一致
+    position = {task: i for i, task in enumerate(nx.topological_sort(G))}
+    return sorted(scheduled_tasks, key=lambda task: (scheduled_tasks[task]['start_time'], position[task]))
+
+
+def sample_durations(rng, base, samples, cv):
+    # 均值为 base、变异系数为 cv 的对数正态分布；cv 为 0 时即确定值
+    base = np.asarray(base, dtype=float)
+    if cv == 0:
+        return np.broadcast_to(base, (samples, len(base)))
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    return base * rng.lognormal(-sigma ** 2 / 2, sigma, (samples, len(base)))
+
+
+def monte_carlo_evaluation(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max, samples=10000,
+                           execution_cv=0.1, transfer_cv=0.2, seed=0):
+    """
+    Re-times a fixed schedule (core assignment, per-core and wireless order, cloud
+    offloads) under `samples` random realizations of the execution and transfer times,
+    with the timing rules of retime_schedule applied to all samples at once as
+    (samples, N) arrays. Returns the makespan distribution, the probability of missing
+    T_max and the expected energy.
+    """
+    rng = np.random.default_rng(seed)
+    order = fixed_order(G, scheduled_tasks)
+    index = {task: k for k, task in enumerate(order)}
+    preds = [np.array([index[pred] for pred in G.predecessors(task)], dtype=int) for task in order]
+    on_cloud = [scheduled_tasks[task]['location'] == 'cloud' for task in order]
+    core = [scheduled_tasks[task].get('core', 1) - 1 for task in order]
+
+    execution = sample_durations(rng, [execution_times[task][c] for task, c in zip(order, core)], samples,
+                                 execution_cv)
+    send = sample_durations(rng, [task_time(T_send, task) for task in order], samples, transfer_cv)
+    cloud = sample_durations(rng, [task_time(T_cloud, task) for task in order], samples, transfer_cv)
+    receive = sample_durations(rng, [task_time(T_receive, task) for task in order], samples, transfer_cv)
+
+    release = np.zeros((samples, len(order)))
+    cores = np.zeros((NUM_CORES, samples))
+    wireless_sending = np.zeros(samples)
+    makespan = np.zeros(samples)
+    for k in range(len(order)):
+        ready_time = release[:, preds[k]].max(axis=1) if len(preds[k]) else np.zeros(samples)
+        if on_cloud[k]:
+            start_cloud = np.maximum(ready_time, wireless_sending) + send[:, k]
+            wireless_sending = release[:, k] = start_cloud
+            finish_time = start_cloud + cloud[:, k] + receive[:, k]
+        else:
+            finish_time = np.maximum(ready_time, cores[core[k]]) + execution[:, k]
+            cores[core[k]] = release[:, k] = finish_time
+        makespan = np.maximum(makespan, finish_time)
+
+    powers = np.array([0 if is_cloud else CORE_POWERS[c + 1] for is_cloud, c in zip(on_cloud, core)])
+    energy = execution @ powers + RF_POWER * (send + receive) @ np.array(on_cloud, dtype=float)
+    return {
+        'makespan_mean': float(makespan.mean()),
+        'makespan_std': float(makespan.std()),
+        'makespan_percentiles': {p: float(v) for p, v in zip((50, 90, 95, 99),
+                                                             np.percentile(makespan, (50, 90, 95, 99)))},
+        'miss_probability': float((makespan > T_max).mean()),
+        'expected_energy': float(energy.mean()),
+    }
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+    T_max = 39
+
+    initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+    for name, schedule in (('Initial', initial_schedule),
+                           ('Migrated', migrate_tasks(G, initial_schedule, execution_times,
+                                                      T_send, T_cloud, T_receive, T_max))):
+        result = monte_carlo_evaluation(G, schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+        percentiles = ", ".join(f"p{p} = {v:.2f}" for p, v in result['makespan_percentiles'].items())
+        print(f"{name}: T_total mean = {result['makespan_mean']:.2f} (std {result['makespan_std']:.2f}, "
+              f"{percentiles}), P(T_total > {T_max}) = {result['miss_probability']:.3f}, "
+              f"E[Energy] = {result['expected_energy']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
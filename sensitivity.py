@@ -0,0 +1,105 @@
+import csv
+import itertools
+import time
+
+from Example5_Final import compute_energy, create_task_graph, initial_scheduling
+from graph_cache import graph_data
+from migration import CORE_POWERS, RF_POWER, migrate_tasks
+
+# 网格参数及其默认值；core_powers 的每个取值是 {核心: 功率} 字典
+GRID_DEFAULTS = {'T_send': [3], 'T_cloud': [1], 'T_receive': [1], 'rf_power': [RF_POWER], 'core_powers': [CORE_POWERS]}
+
+
+def assignment_key(scheduled_tasks):
+    return tuple((task, details['location'], details.get('core')) for task, details in scheduled_tasks.items())
+
+
+def sensitivity_grid(G, execution_times, T_max, grid, cache_dir=None):
+    """
+    Optimizes the schedule at every point of a parameter grid and returns one row per
+    point (the parameters plus T_total, Energy and the number of cloud tasks). grid
+    maps any of the GRID_DEFAULTS keys to a list of values. Priorities and topological
+    order are computed once for all points, and initial_scheduling once per timing.
+
+    Each point is first migrated from its initial schedule (the cold start, the same
+    as evaluating the point alone). Warm starts only cross power-only changes: the
+    cold results at the same timing meet T_max there as well, so the one with the
+    lowest energy under this point's powers (ties broken by makespan, then
+    assignment) is migrated once more and the better result is kept. That is at most
+    two migrations per point, so the grid costs up to twice as much as evaluating the
+    points separately. A row never does worse than the point alone, and it does not
+    depend on grid order, only on the power values listed alongside it.
+    """
+    unknown = set(grid) - set(GRID_DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown grid parameters {sorted(unknown)}")
+    names = list(GRID_DEFAULTS)
+    values = [grid.get(name, GRID_DEFAULTS[name]) for name in names]
+    data = graph_data(G, execution_times, names=('priorities', 'order'), cache_dir=cache_dir)
+
+    def optimize(start, timing, rf_power, core_powers):
+        T_send, T_cloud, T_receive = timing
+        schedule = migrate_tasks(G, start, execution_times, T_send, T_cloud, T_receive, T_max, order=data['order'],
+                                 core_powers=core_powers, rf_power=rf_power)
+        energy = compute_energy(schedule, execution_times, T_send, T_receive, core_powers, rf_power)[2]
+        return energy, max(details['finish_time'] for details in schedule.values()), schedule
+
+    rows = []
+    # names 中计时参数在前，按计时分组后的行顺序与完整网格的笛卡尔积顺序一致
+    for timing in itertools.product(*values[:3]):
+        initial_schedule = initial_scheduling(G, execution_times, *timing, priorities=data['priorities'])
+        powers = list(itertools.product(*values[3:]))
+        cold = [optimize(initial_schedule, timing, *point) for point in powers]
+        # 相同的分配只作为一次热启动起点
+        starts = {assignment_key(result[2]): result[2] for result in cold}
+
+        for point, own in zip(powers, cold):
+            params = dict(zip(names, timing + point))
+            # 只从一个邻居热启动：在当前功率下能耗最低的其他冷启动结果，重新计算能耗不需要再迁移
+            T_send, _, T_receive = timing
+            rf_power, core_powers = point
+            neighbors = sorted(
+                (compute_energy(start, execution_times, T_send, T_receive, core_powers, rf_power)[2],
+                 max(details['finish_time'] for details in start.values()), key, start)
+                for key, start in starts.items() if key != assignment_key(own[2])
+            )
+            best, warm = own, False
+            if neighbors:
+                result = optimize(neighbors[0][3], timing, *point)
+                if result[:2] < best[:2]:
+                    best, warm = result, True
+
+            energy, makespan, schedule = best
+            rows.append(dict(params, **{
+                'T_total': makespan,
+                'Energy': energy,
+                'Cloud tasks': sum(details['location'] == 'cloud' for details in schedule.values()),
+                'Warm start': warm,
+            }))
+    return rows
+
+
+def write_table(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    G, execution_times = create_task_graph()
+    grid = {'T_send': [1, 2, 3, 4, 5], 'T_receive': [1, 2], 'rf_power': [0.25, 0.5, 1.0]}
+
+    start = time.perf_counter()
+    rows = sensitivity_grid(G, execution_times, 39, grid)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'T_send':<8} {'T_receive':<10} {'rf_power':<9} {'T_total':<8} {'Energy':<8} {'Cloud tasks':<12}")
+    for row in rows:
+        print(f"{row['T_send']:<8} {row['T_receive']:<10} {row['rf_power']:<9} {row['T_total']:<8} "
+              f"{row['Energy']:<8} {row['Cloud tasks']:<12}")
+    print(f"{len(rows)} grid points in {elapsed:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 进程内的计数器和直方图，键为 (指标名, 排序后的标签)；以 Prometheus 文本格式导出
+COUNTERS = {}
+HISTOGRAMS = {}
+HELP = {
+    'schedule_migration_candidates_total': "Migration candidates by outcome.",
+    'schedule_migration_moves_total': "Migration moves committed.",
+    'schedule_migration_sweep_seconds': "Duration of one migration call.",
+    'schedule_retime_total': "Schedule re-timing passes.",
+    'schedule_retime_seconds': "Duration of one re-timing pass.",
+    'schedule_graph_cache_total': "Graph cache lookups by result.",
+}
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+_lock = threading.Lock()
+
+
+def inc(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        COUNTERS[key] = COUNTERS.get(key, 0) + value
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        if key not in HISTOGRAMS:
+            HISTOGRAMS[key] = {'buckets': buckets, 'counts': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+        histogram = HISTOGRAMS[key]
+        histogram['counts'][bisect_left(histogram['buckets'], value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+
+def reset_metrics():
+    with _lock:
+        COUNTERS.clear()
+        HISTOGRAMS.clear()
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+
+def prometheus_text():
+    """
+    All counters and histograms in the Prometheus text exposition format (histograms
+    with cumulative le buckets, _sum and _count).
+    """
+    lines = []
+    with _lock:
+        counters = sorted(COUNTERS.items())
+        histograms = sorted((key, dict(value, counts=list(value['counts']))) for key, value in HISTOGRAMS.items())
+
+    seen = set()
+    for (name, labels), value in counters:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{format_labels(labels)} {value}")
+
+    for (name, labels), histogram in histograms:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(list(histogram['buckets']) + ['+Inf'], histogram['counts']):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(path):
+    # node_exporter 的 textfile collector 要求原子替换，避免读到写了一半的文件
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def serve_metrics(port=9100, host='127.0.0.1'):
+    # 在后台线程中提供 /metrics；返回 server，调用 server.shutdown() 停止
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    # migration 导入的是 telemetry 模块本身（而不是作为脚本运行的 __main__），指标记录在那里
+    import telemetry
+    from Example5_Final import create_task_graph, initial_scheduling
+    from migration import migrate_tasks, migrate_until_converged
+
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+    initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+    for T_max in (30, 35, 39):
+        migrate_tasks(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+        migrate_until_converged(G, initial_schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+    print(telemetry.prometheus_text(), end='')
+
+
+if __name__ == '__main__':
+    main()
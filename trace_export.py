@@ -0,0 +1,79 @@
+import json
+
+from Example5_Final import create_task_graph, initial_scheduling, task_time
+from migration import migrate_tasks
+
+
+def task_segments(task, details, T_send, T_cloud, T_receive):
+    # (轨道名, 开始时间, 时长)；多通道/有限云端容量的调度按通道编号分轨
+    if details['location'] == 'core':
+        return [(f"Core {details['core']}", details['start_time'], details['finish_time'] - details['start_time'])]
+
+    send, cloud, receive = task_time(T_send, task), task_time(T_cloud, task), task_time(T_receive, task)
+    # 云端执行不早于发送结束（kernel_algorithm 留下的旧 start_time_cloud 可能更早）
+    start_cloud = max(details['start_time'] + send, details.get('start_time_cloud', 0))
+    start_receive = details.get('start_time_receive', details['finish_time'] - receive)
+    send_channel, receive_channel = details.get('send_channel'), details.get('receive_channel')
+    cloud_unit = details.get('cloud_unit')
+    return [
+        ('Wireless Sending' + (f' {send_channel}' if send_channel else ''), details['start_time'], send),
+        ('Cloud' + (f' {cloud_unit}' if cloud_unit else ''), start_cloud, cloud),
+        ('Wireless Receiving' + (f' {receive_channel}' if receive_channel else ''), start_receive, receive),
+    ]
+
+
+def track_sort_key(track):
+    # 轨道顺序：核心、无线发送、云端、无线接收
+    kind = next(i for i, prefix in enumerate(('Core', 'Wireless Sending', 'Cloud', 'Wireless Receiving'))
+                if track.startswith(prefix))
+    return kind, track
+
+
+def trace_events(scheduled_tasks, T_send, T_cloud, T_receive, pid=1, process_name='Device', time_scale=1000):
+    """
+    Chrome trace events for one schedule: a complete ('X') event per core task and per
+    send / cloud / receive segment of a cloud task, one thread track per resource.
+    Schedule times are multiplied by time_scale to get microseconds.
+    """
+    yield {'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': 0, 'args': {'name': process_name}}
+    tracks = {}
+    for task, details in scheduled_tasks.items():
+        for track, start, duration in task_segments(task, details, T_send, T_cloud, T_receive):
+            if track not in tracks:
+                tracks[track] = len(tracks) + 1
+                yield {'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tracks[track], 'args': {'name': track}}
+                yield {'ph': 'M', 'name': 'thread_sort_index', 'pid': pid, 'tid': tracks[track],
+                       'args': {'sort_index': track_sort_key(track)[0]}}
+            yield {'ph': 'X', 'name': f'Task {task}', 'cat': details['location'], 'pid': pid, 'tid': tracks[track],
+                   'ts': start * time_scale, 'dur': duration * time_scale,
+                   'args': {'task': task, 'ready_time': details.get('ready_time'),
+                            'finish_time': details['finish_time']}}
+
+
+def write_chrome_trace(path, events):
+    # 逐个事件写入文件，不在内存中构建完整的 JSON 文档
+    with open(path, 'w') as f:
+        f.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+        for i, event in enumerate(events):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(event, separators=(',', ':'), default=str))
+        f.write('\n]}\n')
+
+
+def export_chrome_trace(scheduled_tasks, T_send, T_cloud, T_receive, path, time_scale=1000):
+    write_chrome_trace(path, trace_events(scheduled_tasks, T_send, T_cloud, T_receive, time_scale=time_scale))
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+
+    schedule = migrate_tasks(G, initial_scheduling(G, execution_times, T_send, T_cloud, T_receive),
+                             execution_times, T_send, T_cloud, T_receive, 39)
+    export_chrome_trace(schedule, T_send, T_cloud, T_receive, 'scheduling_trace.json')
+    print("Trace saved to 'scheduling_trace.json' (open in https://ui.perfetto.dev or chrome://tracing)")
+
+
+if __name__ == '__main__':
+    main()
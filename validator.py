@@ -0,0 +1,104 @@
+import importlib
+from collections import defaultdict
+
+from Example5_Final import initial_scheduling, task_time
+
+EPS = 1e-9
+
+
+def release_time(details):
+    # 与调度器相同的就绪规则：核心任务在完成时释放后继，云端任务在开始云端执行时释放
+    return details['finish_time'] if details['location'] == 'core' else details['start_time_cloud']
+
+
+def overlapping_intervals(intervals):
+    # intervals: [(start, finish, task)]，排序后相邻比较即可发现重叠
+    intervals.sort()
+    return [(prev, curr) for prev, curr in zip(intervals, intervals[1:]) if curr[0] < prev[1] - EPS]
+
+
+def validate_schedule(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max=None):
+    """
+    Checks a schedule dict and returns a list of violation messages (empty when valid):
+    every task is placed once with the right durations, each edge respects the ready
+    rule (core finish / cloud start_time_cloud), nothing overlaps on a core or on a
+    wireless channel (and on receive channels / cloud units when the schedule records
+    them), and the makespan is within T_max when given. O((N + E) log N).
+    """
+    errors = []
+    missing = set(G.nodes()) - set(scheduled_tasks)
+    if missing:
+        return [f"Tasks not scheduled: {sorted(missing)}"]
+
+    resources = defaultdict(list)
+    for task, details in scheduled_tasks.items():
+        start, finish = details['start_time'], details['finish_time']
+        if details['location'] == 'core':
+            core = details.get('core')
+            if core not in range(1, len(execution_times[task]) + 1):
+                errors.append(f"Task {task}: invalid core {core}")
+                continue
+            if abs(finish - start - execution_times[task][core - 1]) > EPS:
+                errors.append(f"Task {task}: runs {finish - start} on Core {core}, "
+                              f"expected {execution_times[task][core - 1]}")
+            resources[f'Core {core}'].append((start, finish, task))
+        elif details['location'] == 'cloud':
+            send, cloud, receive = task_time(T_send, task), task_time(T_cloud, task), task_time(T_receive, task)
+            start_cloud = details.get('start_time_cloud')
+            if start_cloud is None or start_cloud < start + send - EPS:
+                errors.append(f"Task {task}: cloud execution starts at {start_cloud} before sending ends at "
+                              f"{start + send}")
+            elif finish < start_cloud + cloud + receive - EPS:
+                errors.append(f"Task {task}: finishes at {finish} before receiving can end at "
+                              f"{start_cloud + cloud + receive}")
+            resources[f"Sending {details.get('send_channel', 1)}"].append((start, start + send, task))
+            if 'receive_channel' in details:
+                resources[f"Receiving {details['receive_channel']}"].append((finish - receive, finish, task))
+            if 'cloud_unit' in details:
+                resources[f"Cloud {details['cloud_unit']}"].append((start_cloud, start_cloud + cloud, task))
+        else:
+            errors.append(f"Task {task}: invalid location {details['location']}")
+    if errors:
+        return errors
+
+    for pred, succ in G.edges():
+        if scheduled_tasks[succ]['start_time'] < release_time(scheduled_tasks[pred]) - EPS:
+            errors.append(f"Edge ({pred}, {succ}): Task {succ} starts at {scheduled_tasks[succ]['start_time']} "
+                          f"before Task {pred} releases it at {release_time(scheduled_tasks[pred])}")
+
+    for resource, intervals in sorted(resources.items()):
+        for prev, curr in overlapping_intervals(intervals):
+            errors.append(f"{resource}: Task {prev[2]} [{prev[0]}, {prev[1]}) overlaps "
+                          f"Task {curr[2]} [{curr[0]}, {curr[1]})")
+
+    makespan = max((details['finish_time'] for details in scheduled_tasks.values()), default=0)
+    if T_max is not None and makespan > T_max + EPS:
+        errors.append(f"T_total = {makespan} exceeds T_max = {T_max}")
+    return errors
+
+
+def assert_valid_schedule(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max=None):
+    errors = validate_schedule(G, scheduled_tasks, execution_times, T_send, T_cloud, T_receive, T_max)
+    if errors:
+        raise ValueError("invalid schedule:\n" + "\n".join(errors))
+
+
+def main():
+    from migration import migrate_tasks
+
+    T_send, T_cloud, T_receive = 3, 1, 1
+    for example, T_max in ((2, 27), (3, 38), (4, 36), (5, 39)):
+        module = importlib.import_module(f'Example{example}_Final')
+        G, execution_times = module.create_task_graph()
+        initial_schedule = initial_scheduling(G, execution_times, T_send, T_cloud, T_receive)
+        for name, schedule in (('Initial', initial_schedule),
+                               ('Migrated', migrate_tasks(G, initial_schedule, execution_times,
+                                                          T_send, T_cloud, T_receive, T_max))):
+            errors = validate_schedule(G, schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+            print(f"Example {example} {name}: {'valid' if not errors else f'{len(errors)} violations'}")
+            for error in errors:
+                print(f"  {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import heapq
+
+import networkx as nx
+
+from Example5_Final import compute_energy, create_task_graph, initial_scheduling, task_time
+from migration import NUM_CORES, compute_ready_time, migrate_tasks, place_task, retime_schedule
+
+
+def diff_task_graphs(G_old, G_new):
+    return {
+        'added_nodes': set(G_new.nodes()) - set(G_old.nodes()),
+        'removed_nodes': set(G_old.nodes()) - set(G_new.nodes()),
+        'added_edges': set(G_new.edges()) - set(G_old.edges()),
+        'removed_edges': set(G_old.edges()) - set(G_new.edges()),
+    }
+
+
+def apply_graph_diff(G, graph_diff):
+    G_new = G.copy()
+    G_new.remove_nodes_from(graph_diff.get('removed_nodes', ()))
+    G_new.remove_edges_from(graph_diff.get('removed_edges', ()))
+    G_new.add_nodes_from(graph_diff.get('added_nodes', ()))
+    G_new.add_edges_from(graph_diff.get('added_edges', ()))
+    return G_new
+
+
+def changed_region(G_old, G_new, graph_diff, radius=1):
+    # 变化区域：新增任务、增删边的端点、被删任务的邻居，再向外扩展 radius 跳
+    seeds = set(graph_diff.get('added_nodes', ()))
+    for u, v in set(graph_diff.get('added_edges', ())) | set(graph_diff.get('removed_edges', ())):
+        seeds.update((u, v))
+    for node in graph_diff.get('removed_nodes', ()):
+        seeds.update(G_old.predecessors(node))
+        seeds.update(G_old.successors(node))
+    region = {node for node in seeds if node in G_new}
+
+    frontier = set(region)
+    for _ in range(radius):
+        frontier = {
+            neighbor
+            for node in frontier
+            for neighbor in list(G_new.predecessors(node)) + list(G_new.successors(node))
+        } - region
+        region |= frontier
+
+    return region
+
+
+def _place_new_tasks(G, schedule, old_schedule, execution_times, T_send, T_cloud, T_receive, order):
+    # 按旧开始时间的先后模拟资源占用（sequence_order 的规则）：旧任务保持原位置和原有次序，
+    # 新任务以其 ready 时间插入序列，并按 initial_scheduling 的规则贪心放置。返回模拟的派发顺序
+    position = {task: i for i, task in enumerate(order)}
+    waiting = {task: G.in_degree(task) for task in order}
+    cores = [0] * NUM_CORES
+    wireless_sending = 0
+    sequence = []
+    heap = []
+
+    def push(node):
+        if node in old_schedule:
+            start_time = old_schedule[node]['start_time']
+        else:
+            start_time = compute_ready_time(G, schedule, node)
+        heapq.heappush(heap, (start_time, position[node], node))
+
+    for node in order:
+        if not waiting[node]:
+            push(node)
+
+    while heap:
+        _, _, node = heapq.heappop(heap)
+        sequence.append(node)
+        ready_time = compute_ready_time(G, schedule, node)
+
+        if node not in schedule:
+            core_times = [max(cores[i], ready_time) + execution_times[node][i] for i in range(NUM_CORES)]
+            best_core = core_times.index(min(core_times))
+            cloud_finish_time = (max(wireless_sending, ready_time) + task_time(T_send, node) +
+                                 task_time(T_cloud, node) + task_time(T_receive, node))
+            if cloud_finish_time < core_times[best_core]:
+                schedule[node] = place_task('cloud')
+            else:
+                schedule[node] = place_task('core', best_core + 1)
+
+        details = schedule[node]
+        if details['location'] == 'core':
+            core = details['core'] - 1
+            details['finish_time'] = max(ready_time, cores[core]) + execution_times[node][core]
+            cores[core] = details['finish_time']
+        else:
+            start_sending = max(wireless_sending, ready_time)
+            details['start_time_cloud'] = start_sending + task_time(T_send, node)
+            details['finish_time'] = details['start_time_cloud'] + task_time(T_cloud, node) + task_time(T_receive, node)
+            wireless_sending = details['start_time_cloud']
+
+        for succ in G.successors(node):
+            waiting[succ] -= 1
+            if not waiting[succ]:
+                push(succ)
+
+    return sequence
+
+
+def warm_start_scheduling(G_old, old_schedule, graph_diff, execution_times, T_send, T_cloud, T_receive,
+                          T_max, radius=1):
+    """
+    Re-optimize after a small graph change: surviving tasks keep their old placement
+    and their old order on each resource, new tasks are placed greedily where they
+    become ready, and migration only visits the changed region. If that seed already
+    misses T_max, falls back to a cold initial_scheduling followed by a full
+    migration. Returns the updated graph and schedule.
+    """
+    G_new = apply_graph_diff(G_old, graph_diff)
+
+    schedule = {
+        task: place_task(details['location'], details.get('core'))
+        for task, details in old_schedule.items()
+        if task in G_new
+    }
+    order = _place_new_tasks(G_new, schedule, old_schedule, execution_times, T_send, T_cloud, T_receive,
+                             list(nx.topological_sort(G_new)))
+    critical_time = retime_schedule(G_new, schedule, execution_times, T_send, T_cloud, T_receive, order)
+    if critical_time > T_max:
+        schedule = initial_scheduling(G_new, execution_times, T_send, T_cloud, T_receive)
+        return G_new, migrate_tasks(G_new, schedule, execution_times, T_send, T_cloud, T_receive, T_max)
+
+    region = changed_region(G_old, G_new, graph_diff, radius)
+    tasks = [task for task in order if task in region]
+    return G_new, migrate_tasks(G_new, schedule, execution_times, T_send, T_cloud, T_receive, T_max, tasks)
+
+
+def main():
+    G, execution_times = create_task_graph()
+    T_send, T_cloud, T_receive = 3, 1, 1
+    T_max = 39
+
+    old_schedule = migrate_tasks(G, initial_scheduling(G, execution_times, T_send, T_cloud, T_receive),
+                                 execution_times, T_send, T_cloud, T_receive, T_max)
+
+    # 模拟一次应用更新：新增任务 21，并删掉一条冗余边
+    execution_times = dict(execution_times)
+    execution_times[21] = [6, 4, 2]
+    graph_diff = {'added_nodes': {21}, 'added_edges': {(10, 21), (19, 21)}, 'removed_edges': {(12, 16)}}
+
+    G_new, schedule = warm_start_scheduling(G, old_schedule, graph_diff, execution_times,
+                                            T_send, T_cloud, T_receive, T_max)
+    scratch = migrate_tasks(G_new, initial_scheduling(G_new, execution_times, T_send, T_cloud, T_receive),
+                            execution_times, T_send, T_cloud, T_receive, T_max)
+
+    for name, result in (('Warm start', schedule), ('From scratch', scratch)):
+        critical_time = max(details['finish_time'] for details in result.values())
+        total_energy = compute_energy(result, execution_times, T_send, T_receive)[2]
+        print(f"{name}: T_total = {critical_time}, Energy = {total_energy}")
+
+
+if __name__ == '__main__':
+    main()